@@ -0,0 +1,258 @@
+# aggregations.py
+
+import numpy as np
+import pandas as pd
+
+from filters import FILTER_DIMENSIONS, FilterIndex
+
+# --- Trend Buckets ---
+# The engagement trend uses the finest bucket that keeps the selected date range within
+# TREND_MAX_BUCKETS points, and is then downsampled (LTTB) to TREND_TARGET_POINTS.
+TREND_BUCKETS = ['D', 'W', 'M']
+TREND_BUCKET_DAYS = {'D': 1, 'W': 7, 'M': 30}
+TREND_TARGET_POINTS = 150
+TREND_MAX_BUCKETS = 4 * TREND_TARGET_POINTS
+
+
+def week_start(dates):
+    """Monday 00:00 of each date's week, matching ``dt.to_period('W').dt.start_time``."""
+    days = dates.to_numpy(dtype='datetime64[D]')
+    weekday = (days.view('int64') + 3) % 7  # 1970-01-01 was a Thursday
+    return (days - weekday.astype('timedelta64[D]')).astype('datetime64[ns]')
+
+
+def month_start(dates):
+    """First day 00:00 of each date's month."""
+    return dates.to_numpy(dtype='datetime64[M]').astype('datetime64[ns]')
+
+
+def choose_trend_bucket(start_date, end_date, max_buckets=TREND_MAX_BUCKETS):
+    """Finest of TREND_BUCKETS ('D', 'W', 'M') that spans ``start_date..end_date`` in at most ``max_buckets`` points."""
+    span_days = (end_date - start_date).days + 1
+    for bucket in TREND_BUCKETS:
+        if span_days / TREND_BUCKET_DAYS[bucket] <= max_buckets:
+            return bucket
+    return TREND_BUCKETS[-1]
+
+
+def lttb_indices(x, y, threshold):
+    """Positions of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; every bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket, so peaks and dips survive the downsampling.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, threshold - 1).astype('int64')
+
+    kept = np.empty(threshold, dtype='int64')
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_lo, next_hi = hi, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(areas.argmax())
+        kept[bucket + 1] = previous
+    return kept
+
+
+def _compact_cells(rollup):
+    # Cells keep every dimension and the day as categoricals (one- or two-byte codes) and
+    # counts as int32; engagement sums stay int32 unless pandas had to widen them.
+    for col in [dim for dim in FILTER_DIMENSIONS if dim in rollup.columns] + ['date']:
+        # Categoricals with different categories concatenate to object; re-encode the (small) cells
+        if not isinstance(rollup[col].dtype, pd.CategoricalDtype):
+            rollup[col] = rollup[col].astype('category')
+    rollup['count'] = rollup['count'].astype('int32')
+    return rollup.sort_values('date', kind='stable', ignore_index=True)
+
+
+def build_rollup(df):
+    """One pass over ``df``: engagement sums and row counts per dimension combination and day.
+
+    The result keeps the dimension columns and a day-truncated categorical
+    ``date`` column, sorted by date, so it can itself be filtered with a
+    FilterIndex.
+    """
+    dims = [dim for dim in FILTER_DIMENSIONS if dim in df.columns]
+    day = pd.Series(df['date'].to_numpy(dtype='datetime64[D]').astype('datetime64[ns]'), index=df.index, name='date')
+    grouped = df.groupby([df[dim] for dim in dims] + [day], observed=True, sort=False, dropna=False)['engagements']
+    rollup = grouped.agg(['sum', 'size']).rename(columns={'sum': 'engagements', 'size': 'count'})
+    return _compact_cells(rollup.reset_index())
+
+
+def combine_rollups(rollups):
+    """Sum rollups of disjoint sets of rows into the rollup of all of them."""
+    combined = _compact_cells(pd.concat(rollups, ignore_index=True))
+    dims = [dim for dim in FILTER_DIMENSIONS if dim in combined.columns]
+    grouped = combined.groupby(dims + ['date'], observed=True, sort=False, dropna=False)
+    rollup = grouped[['engagements', 'count']].sum()
+    return _compact_cells(rollup.reset_index())
+
+
+class DashboardSummary:
+    """Every table the dashboard shows, derived from a (filtered) rollup.
+
+    Chart builders, ``get_insights`` and the KPI row all read from here instead of
+    grouping ``df_filtered`` themselves.
+    """
+
+    def __init__(self, rollup):
+        self.num_rows = int(rollup['count'].sum())
+        self.total_engagements = int(rollup['engagements'].sum())
+
+        self.sentiment_counts = self._counts(rollup, 'sentiment')
+        self.media_type_counts = self._counts(rollup, 'media_type')
+        self.platform_engagements = self._engagements(rollup, 'platform')
+        self.location_engagements = self._engagements(rollup, 'location')
+        self.num_platforms = len(self.platform_engagements)
+
+        daily = rollup.groupby('date', observed=True, sort=True)['engagements'].sum()
+        # Rollups keep the day as a categorical; the trend tables use a plain DatetimeIndex
+        daily.index = pd.DatetimeIndex(np.asarray(daily.index, dtype='datetime64[ns]'), name='date')
+        self.daily_engagements = daily
+        self.weekly_engagements = self._resample(self.daily_engagements, 'W').reset_index()
+        self._insight_stats = None
+
+    @staticmethod
+    def _counts(rollup, dim):
+        counts = rollup.groupby(dim, observed=True)['count'].sum()
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    @staticmethod
+    def _engagements(rollup, dim):
+        return rollup.groupby(dim, observed=True)['engagements'].sum()
+
+    @staticmethod
+    def _resample(daily, bucket):
+        if bucket == 'D':
+            return daily
+        starts = week_start(daily.index) if bucket == 'W' else month_start(daily.index)
+        return daily.groupby(pd.Index(starts, name='date')).sum()
+
+    @property
+    def empty(self):
+        return self.num_rows == 0
+
+    @property
+    def nbytes(self):
+        tables = [self.sentiment_counts, self.media_type_counts, self.platform_engagements,
+                  self.location_engagements, self.daily_engagements, self.weekly_engagements]
+        # Series.memory_usage returns an int, DataFrame.memory_usage a per-column Series
+        return sum(int(np.sum(table.memory_usage(index=True, deep=True))) for table in tables)
+
+    def top_locations(self, n=5):
+        return self.location_engagements.nlargest(n).sort_values(ascending=True)
+
+    @property
+    def insight_stats(self):
+        """Statistics bundle the insight templates are rendered from, built once per summary."""
+        if self._insight_stats is None:
+            self._insight_stats = build_insight_stats(self)
+        return self._insight_stats
+
+    def engagement_trend(self, start_date, end_date, target_points=TREND_TARGET_POINTS, bucket=None):
+        """Engagement totals per bucket for the trend chart, plus the bucket used.
+
+        Unless ``bucket`` is given, it is chosen from the selected date range;
+        series longer than ``target_points`` are LTTB-downsampled so the chart
+        payload stays small.
+        """
+        if bucket is None:
+            bucket = choose_trend_bucket(start_date, end_date, max_buckets=4 * target_points)
+        trend = self._resample(self.daily_engagements, bucket).reset_index()
+        if len(trend) > target_points:
+            x = trend['date'].to_numpy(dtype='datetime64[ns]').view('int64')
+            kept = lttb_indices(x, trend['engagements'].to_numpy(), target_points)
+            trend = trend.iloc[kept].reset_index(drop=True)
+        return trend, bucket
+
+
+def _add_ranked(stats, prefix, ranked):
+    # Count plus the first, second and last entries of an already ordered Series
+    stats[f'{prefix}_count'] = len(ranked)
+    for name, position in {'first': 0, 'second': 1, 'last': len(ranked) - 1}.items():
+        if 0 <= position < len(ranked):
+            stats[f'{prefix}_{name}_name'] = ranked.index[position]
+            stats[f'{prefix}_{name}_value'] = ranked.iloc[position]
+    if len(ranked):
+        stats[f'{prefix}_last_distinct'] = ranked.index[-1] not in list(ranked.index[:2])
+
+
+def build_insight_stats(summary):
+    """Flat dict of the shares, extremes, totals and top-k entries quoted by the insights.
+
+    Ranked tables are stored as ``<prefix>_count`` and ``<prefix>_{first,second,last}_{name,value}``
+    in the order the charts list them.
+    """
+    stats = {'num_rows': summary.num_rows, 'total_engagements': summary.total_engagements}
+
+    sentiment_shares = summary.sentiment_counts / summary.sentiment_counts.sum()
+    stats['sentiment_count'] = len(sentiment_shares)
+    if len(sentiment_shares):
+        stats['sentiment_top_name'] = sentiment_shares.idxmax()
+        stats['sentiment_top_share'] = sentiment_shares.max()
+    for sentiment in ['positive', 'negative', 'neutral']:
+        stats[f'sentiment_{sentiment}_pct'] = sentiment_shares.get(sentiment, 0) * 100
+
+    weekly = summary.weekly_engagements
+    stats['trend_weeks'] = len(weekly)
+    if len(weekly):
+        stats['trend_peak_week'] = weekly.loc[weekly['engagements'].idxmax(), 'date']
+        stats['trend_low_week'] = weekly.loc[weekly['engagements'].idxmin(), 'date']
+        stats['trend_total'] = weekly['engagements'].sum()
+
+    _add_ranked(stats, 'platform', summary.platform_engagements.sort_values(ascending=True))
+    _add_ranked(stats, 'media_type', summary.media_type_counts / summary.media_type_counts.sum())
+
+    top_locations = summary.top_locations(5)
+    _add_ranked(stats, 'top_location', top_locations)
+    stats['top_location_rest_count'] = max(len(top_locations) - 2, 0)
+    stats['top_location_rest_value'] = top_locations.iloc[2:].sum()
+    stats['location_count'] = len(summary.location_engagements)
+    return stats
+
+
+def summarize(df):
+    return DashboardSummary(build_rollup(df))
+
+
+class RollupCube:
+    """Pre-aggregated platform x sentiment x media_type x location x day cube of a dataset.
+
+    Built once at ingest (``Dataset.build_indexes``) and extended rather than
+    rebuilt when files are appended. Sidebar filters select cube cells (through
+    the same FilterIndex used for raw rows), so summaries cost time proportional
+    to the number of cells rather than the number of rows. With many locations the
+    cube can have more than half as many cells as the data has rows, so cells
+    are stored compactly and indexed by date slice and category codes only,
+    without per-value bitmaps.
+    """
+
+    def __init__(self, df):
+        self.cells = build_rollup(df)
+        self.index = FilterIndex(self.cells, bitmap_max_values=0)
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Cube over an already built rollup (e.g. from ``combine_rollups``)."""
+        cube = cls.__new__(cls)
+        cube.cells = cells
+        cube.index = FilterIndex(cells, bitmap_max_values=0)
+        return cube
+
+    @property
+    def nbytes(self):
+        return int(self.cells.memory_usage(index=True, deep=True).sum()) + self.index.nbytes
+
+    def summarize(self, selections, date_range=None):
+        return DashboardSummary(self.index.apply(self.cells, selections, date_range=date_range))
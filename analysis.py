@@ -0,0 +1,210 @@
+# analysis.py
+"""The dashboard's analysis pipeline, free of Streamlit calls.
+
+streamlit_app.py renders what these functions return; batch.py runs the same
+steps over a directory of files so reports can be precomputed outside the UI.
+"""
+
+import os
+
+import plotly.express as px
+
+from charts import geo_chart, horizontal_bar_chart, line_chart, pie_chart
+from diagnostics import no_stage
+from exporting import count_rows, write_export
+from ingest import (
+    CHUNKED_INGEST_MIN_BYTES,
+    PARALLEL_INGEST_MIN_BYTES,
+    Dataset,
+    file_digest,
+    read_media_csv,
+    read_media_csv_chunked,
+    read_media_csv_parallel,
+)
+from insights import INSIGHT_TEMPLATES, get_insights
+
+# --- Engagement Trend Buckets ---
+# Chart title suffix and x-axis label per bucket chosen by DashboardSummary.engagement_trend
+TREND_BUCKET_LABELS = {
+    'D': ('Harian', 'Tanggal'),
+    'W': ('Mingguan', 'Tanggal (Awal Minggu)'),
+    'M': ('Bulanan', 'Tanggal (Awal Bulan)'),
+}
+TREND_MARKERS_MAX_POINTS = 60
+
+
+# --- Loading ---
+def read_dataset(file_bytes, key=None, source_name=None, executor=None, progress=None, stage=no_stage):
+    """Parse, clean and compact one CSV file into a Dataset.
+
+    Files from CHUNKED_INGEST_MIN_BYTES are read chunk by chunk (reporting to
+    ``progress``), and from PARALLEL_INGEST_MIN_BYTES range by range on
+    ``executor`` when one is given and there is more than one core. The
+    dataset's rollup cube and location matches are built before it is returned.
+    """
+    if len(file_bytes) >= PARALLEL_INGEST_MIN_BYTES and executor is not None and (os.cpu_count() or 1) > 1:
+        df, report = read_media_csv_parallel(file_bytes, executor, progress=progress, stage=stage)
+    elif len(file_bytes) >= CHUNKED_INGEST_MIN_BYTES:
+        df, report = read_media_csv_chunked(file_bytes, progress=progress, stage=stage)
+    else:
+        df, report = read_media_csv(file_bytes, stage=stage)
+    return Dataset(key or file_digest(file_bytes), df, report=report, source_name=source_name).build_indexes(stage)
+
+
+def open_stored_dataset(store, key):
+    """Dataset saved earlier in ``store`` (a DatasetStore), memory-mapped instead of re-parsed,
+    with its rollup cube and location matches built."""
+    meta = store.metadata(key)
+    return Dataset(key, store.load(key), report=meta.get('report'), source_name=meta.get('source_name')).build_indexes()
+
+
+def load_files(files, store=None, base_dataset=None, executor=None, progress=None, stage=no_stage,
+               on_store_error=None):
+    """One Dataset from several CSV files, each given as ``(name, key, file_bytes)``.
+
+    ``base_dataset`` is extended when all of its files are among ``files``, so
+    adding one more file only parses that file. Files already in ``store`` are
+    memory-mapped; the others are parsed and saved there, with save failures
+    passed to ``on_store_error(name, error)``. ``progress(rows_read, bytes_read,
+    total_bytes)`` covers all files and is called at least once per file. The
+    combined dataset's rollup cube and location matches are built before it is
+    returned, so a background ingest job is only done once the dataset is ready
+    to render.
+    """
+    keys = [key for _, key, _ in files]
+    dataset = base_dataset if base_dataset is not None and set(base_dataset.source_keys) <= set(keys) else None
+    total_bytes = sum(len(file_bytes) for _, _, file_bytes in files)
+    rows_done = bytes_done = 0
+    for name, key, file_bytes in files:
+        if dataset is None or key not in dataset.source_keys:
+            def file_progress(rows_read, bytes_read, file_total_bytes):
+                progress(rows_done + rows_read, bytes_done + bytes_read, total_bytes)
+
+            if store is not None and key in store:
+                file_dataset = open_stored_dataset(store, key)
+            else:
+                file_dataset = read_dataset(file_bytes, key=key, source_name=name, executor=executor,
+                                            progress=file_progress if progress is not None else None, stage=stage)
+                if store is not None:
+                    try:
+                        store.save(key, file_dataset.df, source_name=name, report=file_dataset.report)
+                    except Exception as e:
+                        if on_store_error is None:
+                            raise
+                        on_store_error(name, e)
+            dataset = file_dataset if dataset is None else dataset.append(file_dataset)
+            rows_done += file_dataset.report.get('rows_read', len(file_dataset.df))
+        bytes_done += len(file_bytes)
+        if progress is not None:
+            progress(rows_done, bytes_done, total_bytes)
+    return dataset if dataset is None else dataset.build_indexes(stage)
+
+
+def full_date_range(dataset):
+    """First and last day of the dataset, the default date filter."""
+    return dataset.df['date'].min().date(), dataset.df['date'].max().date()
+
+
+# --- Figures ---
+def sentiment_figure(summary):
+    return pie_chart(summary.sentiment_counts, '**Distribusi Sentimen**', px.colors.qualitative.Pastel)
+
+
+def platform_figure(summary):
+    return horizontal_bar_chart(summary.platform_engagements.sort_values(ascending=True), '**Total Engagement per Platform**',
+                                'Total Engagements', 'Platform', px.colors.qualitative.Set2)
+
+
+def media_type_figure(summary):
+    return pie_chart(summary.media_type_counts, '**Distribusi Tipe Media**', px.colors.qualitative.Vivid)
+
+
+def top_locations_figure(summary):
+    return horizontal_bar_chart(summary.top_locations(5), '**Top 5 Lokasi Berdasarkan Total Engagement**',
+                                'Total Engagements', 'Lokasi', px.colors.qualitative.Dark24)
+
+
+def trend_figure(summary, start_date, end_date, bucket=None):
+    """Engagement trend line plus the trend frame and bucket it was drawn from.
+
+    The bucket follows the date range unless given; long series are LTTB-downsampled.
+    """
+    trend, bucket = summary.engagement_trend(start_date, end_date, bucket=bucket)
+    trend_title, trend_axis = TREND_BUCKET_LABELS[bucket]
+    fig = line_chart(trend, 'date', 'engagements', f'**Tren Engagement dari Waktu ke Waktu ({trend_title})**',
+                     trend_axis, 'Total Engagements', "#4A90E2", markers=len(trend) <= TREND_MARKERS_MAX_POINTS)
+    return fig, trend, bucket
+
+
+def location_map_frame(summary, dataset):
+    """Engagements per location with gazetteer coordinates, plus the locations that did not resolve.
+
+    Locations are resolved once per dataset (Dataset.locations); this only joins coordinates.
+    Unresolved locations stay in the frame without coordinates, for geo_chart to try as
+    country names.
+    """
+    frame = summary.location_engagements.rename('total_engagements').reset_index()
+    frame['location'] = frame['location'].astype(object)
+    frame = frame.join(dataset.locations[['lat', 'lon']], on='location')
+    unresolved = frame.loc[frame['lat'].isna(), 'location']
+    return frame, unresolved
+
+
+def geo_figure(location_frame):
+    return geo_chart(location_frame, "total_engagements", "location", "**Peta Engagement Berdasarkan Lokasi**")
+
+
+# Charts drawn from the summary alone, by insight chart title
+SUMMARY_FIGURES = {
+    "Sentiment Breakdown": sentiment_figure,
+    "Platform Engagements": platform_figure,
+    "Media Type Mix": media_type_figure,
+    "Top 5 Locations": top_locations_figure,
+}
+
+
+def build_figures(summary, dataset, date_range):
+    """Every dashboard chart for one summary, by insight chart title."""
+    figures = {chart_title: build_figure(summary) for chart_title, build_figure in SUMMARY_FIGURES.items()}
+    figures["Engagement Trend over Time"] = trend_figure(summary, *date_range)[0]
+    figures["Geographical Engagement"] = geo_figure(location_map_frame(summary, dataset)[0])
+    return figures
+
+
+# --- Reports ---
+def all_insights(summary):
+    return {chart_title: get_insights(chart_title, summary) for chart_title in INSIGHT_TEMPLATES}
+
+
+def _series_dict(series):
+    return {str(label): value.item() if hasattr(value, 'item') else value for label, value in series.items()}
+
+
+def summary_report(summary, date_range=None):
+    """KPIs, chart tables and insights of a summary as plain JSON-serialisable values."""
+    weekly = summary.weekly_engagements
+    return {
+        'date_range': None if date_range is None else [str(bound) for bound in date_range],
+        'kpis': {
+            'total_engagements': summary.total_engagements,
+            'num_platforms': summary.num_platforms,
+            'num_rows': summary.num_rows,
+        },
+        'sentiment_counts': _series_dict(summary.sentiment_counts),
+        'media_type_counts': _series_dict(summary.media_type_counts),
+        'platform_engagements': _series_dict(summary.platform_engagements),
+        'location_engagements': _series_dict(summary.location_engagements),
+        'weekly_engagements': _series_dict(weekly.set_index(weekly['date'].dt.strftime('%Y-%m-%d'))['engagements']),
+        'insights': all_insights(summary),
+    }
+
+
+def export_filtered(dataset, selections, date_range, path, export_format):
+    """Write the rows matching the filters to ``path``; returns how many were written.
+
+    Rows are selected through the precomputed FilterIndex and streamed chunk by
+    chunk, so the filtered frame is never materialised.
+    """
+    rows = dataset.filter_index.select(selections, date_range=date_range)
+    write_export(dataset.df, path, export_format, rows=rows)
+    return count_rows(dataset.df, rows)
@@ -0,0 +1,129 @@
+# batch.py
+"""Precompute dashboard reports for a directory of client CSV files.
+
+Run from the repository root, e.g.::
+
+    python batch.py clients/ --output reports/ --workers 8 --export-format csv --warm-store
+
+Every ``*.csv`` in the directory is analysed in its own worker process. Each
+file gets ``<name>.json`` (ingest report, KPIs, chart tables and insights over
+its whole date range) and ``<name>_data.<format>`` (the cleaned rows), and
+``batch_summary.json`` lists the outcome per file. With ``--warm-store`` the
+cleaned datasets are also saved to the dataset store, so the dashboard opens
+them memory-mapped instead of parsing the CSV again. Without an upload they
+are offered in the dashboard when it runs with ``DASHBOARD_SHARED_STORE=1``.
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from analysis import export_filtered, full_date_range, open_stored_dataset, read_dataset, summary_report
+from data_store import DEFAULT_STORE_DIR, DatasetStore
+from exporting import EXPORT_FORMATS
+from ingest import file_digest
+
+
+def analyze_file(csv_path, output_dir, export_format='csv', store_root=None):
+    """Analyse one CSV file and write its report (and export); returns a summary of the run."""
+    started = time.perf_counter()
+    source_name = os.path.basename(csv_path)
+    name = os.path.splitext(source_name)[0]
+    with open(csv_path, 'rb') as fh:
+        file_bytes = fh.read()
+    key = file_digest(file_bytes)
+
+    store = DatasetStore(store_root) if store_root else None
+    if store is not None and key in store:
+        dataset = open_stored_dataset(store, key)
+    else:
+        dataset = read_dataset(file_bytes, key=key, source_name=source_name)
+        if store is not None:
+            store.save(key, dataset.df, source_name=source_name, report=dataset.report)
+    del file_bytes
+
+    date_range = full_date_range(dataset)
+    summary = dataset.cube.summarize({}, date_range=date_range)
+    report = {'source': source_name, 'key': key, 'ingest': dataset.report, **summary_report(summary, date_range)}
+    report_path = os.path.join(output_dir, f"{name}.json")
+    with open(report_path, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False, default=str)
+
+    export_path = None
+    if export_format:
+        export_path = os.path.join(output_dir, f"{name}_data{EXPORT_FORMATS[export_format]['suffix']}")
+        export_filtered(dataset, {}, None, export_path, export_format)
+
+    return {
+        'source': source_name,
+        'key': key,
+        'rows': len(dataset.df),
+        'total_engagements': summary.total_engagements,
+        'report': report_path,
+        'export': export_path,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def run_batch(csv_paths, output_dir, workers=None, export_format='csv', store_root=None):
+    """Analyse ``csv_paths`` across a process pool; one failing file does not stop the others."""
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(analyze_file, csv_path, output_dir, export_format, store_root): csv_path
+            for csv_path in csv_paths
+        }
+        for number, future in enumerate(as_completed(futures), start=1):
+            csv_path = futures[future]
+            try:
+                result = future.result()
+                print(f"[{number}/{len(futures)}] {result['source']}: {result['rows']:,} baris, {result['seconds']:.2f} s")
+            except Exception as e:
+                result = {'source': os.path.basename(csv_path), 'error': str(e)}
+                print(f"[{number}/{len(futures)}] {result['source']}: gagal ({e})")
+            results.append(result)
+    return sorted(results, key=lambda result: result['source'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate dashboard reports for every CSV file in a directory.")
+    parser.add_argument('input_dir')
+    parser.add_argument('--output', default='reports')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--export-format', default='csv', choices=list(EXPORT_FORMATS) + ['none'])
+    parser.add_argument('--warm-store', action='store_true',
+                        help="Also save the cleaned datasets to the dashboard's dataset store.")
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR)
+    args = parser.parse_args(argv)
+
+    csv_paths = sorted(glob.glob(os.path.join(args.input_dir, '*.csv')))
+    if not csv_paths:
+        parser.error(f"Tidak ada file CSV di {args.input_dir}")
+
+    started = time.perf_counter()
+    results = run_batch(
+        csv_paths, args.output, workers=args.workers,
+        export_format=None if args.export_format == 'none' else args.export_format,
+        store_root=args.store_dir if args.warm_store else None,
+    )
+    summary_path = os.path.join(args.output, 'batch_summary.json')
+    with open(summary_path, 'w', encoding='utf-8') as fh:
+        json.dump({
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'input_dir': args.input_dir,
+            'export_format': args.export_format,
+            'seconds': round(time.perf_counter() - started, 3),
+            'files': results,
+        }, fh, indent=2, ensure_ascii=False)
+    failed = sum('error' in result for result in results)
+    print(f"{len(results) - failed} dari {len(results)} file berhasil. Ringkasan disimpan di {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+# benchmarks/run.py
+"""Time each stage of the dashboard pipeline on synthetic datasets and write the results as JSON.
+
+Run from the repository root, e.g.::
+
+    python -m benchmarks.run --rows 10000 1000000 10000000 --output benchmark_results.json
+
+Compare the JSON of two runs to catch regressions; every run records the
+generator settings, library versions and per-stage wall times in seconds.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+
+import pandas as pd
+
+from analysis import (
+    geo_figure,
+    location_map_frame,
+    media_type_figure,
+    platform_figure,
+    sentiment_figure,
+    top_locations_figure,
+    trend_figure,
+)
+from exporting import write_export
+from ingest import Dataset, apply_compact_schema, clean_rows, file_digest, sort_by_date
+from insights import INSIGHT_TEMPLATES, get_insights
+
+from benchmarks.synthetic import generate_media_csv
+
+DEFAULT_ROW_COUNTS = [10_000, 1_000_000, 10_000_000]
+
+
+@contextlib.contextmanager
+def timed(stages, name):
+    start = time.perf_counter()
+    yield
+    stages[name] = round(time.perf_counter() - start, 6)
+
+
+def sample_filter(dataset):
+    """A typical sidebar state: the two busiest platforms, three locations and the middle half of the date range."""
+    df = dataset.df
+    platforms = df['platform'].value_counts().index[:2].tolist()
+    locations = df['location'].value_counts().index[:3].tolist()
+    first, last = df['date'].min().date(), df['date'].max().date()
+    quarter = (last - first) / 4
+    selections = dataset.cube.index.normalize({
+        'platform': platforms, 'sentiment': None, 'media_type': None, 'location': locations,
+    })
+    return selections, (first + quarter, last - quarter)
+
+
+# Aggregation plus figure build per chart, through the same builders as the dashboard panels
+CHART_STAGES = {
+    'Sentiment Breakdown': lambda summary, dataset, date_range: sentiment_figure(summary),
+    'Engagement Trend over Time': lambda summary, dataset, date_range: trend_figure(summary, *date_range),
+    'Platform Engagements': lambda summary, dataset, date_range: platform_figure(summary),
+    'Media Type Mix': lambda summary, dataset, date_range: media_type_figure(summary),
+    'Top 5 Locations': lambda summary, dataset, date_range: top_locations_figure(summary),
+    'Geographical Engagement': lambda summary, dataset, date_range: geo_figure(location_map_frame(summary, dataset)[0]),
+}
+
+
+def run_pipeline(file_bytes, export_format='xlsx'):
+    """Run every dashboard stage once on ``file_bytes`` and return ``{stage: seconds}``."""
+    stages = {}
+    with timed(stages, 'read_csv'):
+        raw = pd.read_csv(io.BytesIO(file_bytes))
+    with timed(stages, 'cleaning'):
+        df, _ = clean_rows(raw)
+    with timed(stages, 'compact_schema'):
+        df, _ = apply_compact_schema(df)
+        df = sort_by_date(df)
+    dataset = Dataset(file_digest(file_bytes), df)
+
+    with timed(stages, 'filter_index'):
+        dataset.filter_index
+    with timed(stages, 'rollup_cube'):
+        dataset.cube
+    with timed(stages, 'location_lookup'):
+        dataset.locations
+
+    selections, date_range = sample_filter(dataset)
+    with timed(stages, 'filter_rows'):
+        rows = dataset.filter_index.select(selections, date_range=date_range)
+    with timed(stages, 'filter_summary'):
+        summary = dataset.cube.summarize(selections, date_range=date_range)
+
+    for chart_title, build_chart in CHART_STAGES.items():
+        with timed(stages, f'chart: {chart_title}'):
+            build_chart(summary, dataset, date_range)
+
+    with timed(stages, 'insight_stats'):
+        summary.insight_stats
+    for chart_title in INSIGHT_TEMPLATES:
+        with timed(stages, f'insights: {chart_title}'):
+            get_insights(chart_title, summary)
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        with timed(stages, f'export_{export_format}'):
+            write_export(dataset.df, os.path.join(export_dir, f'export.{export_format}'), export_format, rows=rows)
+
+    return stages
+
+
+def run_benchmarks(row_counts, workdir, export_format='xlsx', **generator_options):
+    runs = []
+    for row_count in row_counts:
+        csv_path = os.path.join(workdir, f'synthetic_{row_count}.csv')
+        started = time.perf_counter()
+        generate_media_csv(csv_path, row_count, **generator_options)
+        generate_seconds = round(time.perf_counter() - started, 6)
+        with open(csv_path, 'rb') as fh:
+            file_bytes = fh.read()
+        os.remove(csv_path)
+
+        stages = run_pipeline(file_bytes, export_format=export_format)
+        runs.append({
+            'rows': row_count,
+            'file_bytes': len(file_bytes),
+            'generate_seconds': generate_seconds,
+            'total_seconds': round(sum(stages.values()), 6),
+            'stages': stages,
+        })
+        print(f"{row_count:>12,} rows: {runs[-1]['total_seconds']:.3f} s")
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pipeline on synthetic data.")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROW_COUNTS)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--export-format', default='xlsx', choices=['xlsx', 'csv', 'csv.gz', 'parquet'])
+    parser.add_argument('--platforms', type=int, default=5)
+    parser.add_argument('--locations', type=int, default=30)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--dirty-ratio', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generator_options = {
+        'platforms': args.platforms, 'locations': args.locations, 'days': args.days,
+        'dirty_ratio': args.dirty_ratio, 'seed': args.seed,
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        runs = run_benchmarks(args.rows, workdir, export_format=args.export_format, **generator_options)
+
+    results = {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'generator': generator_options,
+        'export_format': args.export_format,
+        'runs': runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Hasil disimpan di {args.output}")
+
+
+if __name__ == '__main__':
+    main()
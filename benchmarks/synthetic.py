@@ -0,0 +1,87 @@
+# benchmarks/synthetic.py
+
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from geocoding import load_gazetteer
+
+PLATFORMS = ['Instagram', 'TikTok', 'Twitter', 'Facebook', 'YouTube', 'LinkedIn', 'Threads', 'News Online']
+SENTIMENTS = ['positive', 'neutral', 'negative']
+MEDIA_TYPES = ['image', 'video', 'text', 'carousel', 'reel', 'story']
+CSV_COLUMNS = ['Date', 'Platform', 'Sentiment', 'Location', 'Engagements', 'Media Type']
+GENERATE_CHUNK_ROWS = 500_000
+
+
+def location_names(count):
+    """``count`` location names: gazetteer places first, then synthetic ones that will not resolve."""
+    names = sorted(load_gazetteer()['name'].unique())
+    return (names + [f"Lokasi {number}" for number in range(count)])[:count]
+
+
+def generate_chunk(rng, rows, platforms, locations, start_date, days, dirty_ratio):
+    dates = np.datetime64(start_date) + rng.integers(0, days, rows).astype('timedelta64[D]')
+    # Heavy-tailed engagement counts, like real social media data
+    engagements = np.minimum(rng.lognormal(mean=5, sigma=1.5, size=rows), 10_000_000).astype(np.int64)
+    chunk = pd.DataFrame({
+        'Date': pd.Series(dates).dt.strftime('%Y-%m-%d'),
+        'Platform': rng.choice(platforms, rows),
+        'Sentiment': rng.choice(SENTIMENTS, rows, p=[0.5, 0.3, 0.2]),
+        'Location': rng.choice(locations, rows),
+        'Engagements': engagements.astype(object),
+        'Media Type': rng.choice(MEDIA_TYPES, rows),
+    })
+
+    # Dirty values the cleaning step has to cope with, split evenly over four kinds:
+    # unparseable dates, missing dates, dates in another format and non-numeric engagements
+    dirty = np.flatnonzero(rng.random(rows) < dirty_ratio)
+    kinds = rng.integers(0, 4, len(dirty))
+    chunk.loc[dirty[kinds == 0], 'Date'] = 'tanggal tidak valid'
+    chunk.loc[dirty[kinds == 1], 'Date'] = None
+    other_format = dirty[kinds == 2]
+    chunk.loc[other_format, 'Date'] = pd.Series(dates[other_format]).dt.strftime('%d/%m/%Y %H:%M').to_numpy()
+    chunk.loc[dirty[kinds == 3], 'Engagements'] = rng.choice(['', 'n/a', '-'], int((kinds == 3).sum()))
+    return chunk
+
+
+def generate_media_csv(path, rows, platforms=5, locations=30, start_date='2023-01-01', days=365,
+                       dirty_ratio=0.01, seed=0, chunk_rows=GENERATE_CHUNK_ROWS):
+    """Write a synthetic media-monitoring CSV in the dashboard's upload schema.
+
+    ``platforms`` and ``locations`` set the cardinality of those columns,
+    ``days`` the date span from ``start_date`` and ``dirty_ratio`` the share
+    of rows with a dirty value. The same arguments always produce the same
+    file; it is written in chunks so memory stays bounded for large row counts.
+    """
+    rng = np.random.default_rng(seed)
+    platform_names = (PLATFORMS + [f"Platform {number}" for number in range(platforms)])[:platforms]
+    location_list = location_names(locations)
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        for chunk_start in range(0, rows, chunk_rows):
+            chunk_size = min(chunk_rows, rows - chunk_start)
+            chunk = generate_chunk(rng, chunk_size, platform_names, location_list, start_date, days, dirty_ratio)
+            chunk.to_csv(fh, index=False, header=chunk_start == 0, columns=CSV_COLUMNS)
+        if rows == 0:
+            pd.DataFrame(columns=CSV_COLUMNS).to_csv(fh, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic media-monitoring CSV.")
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--platforms', type=int, default=5)
+    parser.add_argument('--locations', type=int, default=30)
+    parser.add_argument('--start-date', default='2023-01-01', type=datetime.date.fromisoformat)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--dirty-ratio', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_media_csv(args.path, args.rows, platforms=args.platforms, locations=args.locations,
+                       start_date=args.start_date, days=args.days, dirty_ratio=args.dirty_ratio, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# caching.py
+
+import threading
+from collections import OrderedDict
+
+
+class SizedLRUCache:
+    """Thread-safe LRU bounded by entry count and by the summed ``nbytes`` of its values.
+
+    Values must expose an ``nbytes`` attribute. ``get_or_load`` runs the loader
+    at most once per key even when several callers ask for it concurrently.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Lock held while that key is loading
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = value
+            self._total_bytes += value.nbytes
+            self._evict()
+        return value
+
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key)
+                if value is None:
+                    value = self.put(key, loader())
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return value
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the cap.
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            _, value = self._entries.popitem(last=False)
+            self._total_bytes -= value.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
@@ -0,0 +1,116 @@
+# charts.py
+
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# --- Dashboard Theme ---
+# One small template shared by every chart, instead of repeating the same layout
+# settings per figure and shipping the (much larger) default template with each one.
+FONT_COLOR = '#E0E0E0'
+GRID_COLOR = '#2C425C'
+TRANSPARENT = 'rgba(0,0,0,0)'
+
+DASHBOARD_TEMPLATE = go.layout.Template(layout=dict(
+    font=dict(family='Source Sans Pro, sans-serif', color=FONT_COLOR),
+    title=dict(x=0.5),
+    margin=dict(t=50, b=0, l=0, r=0),
+    plot_bgcolor=TRANSPARENT,
+    paper_bgcolor=TRANSPARENT,
+    xaxis=dict(gridcolor=GRID_COLOR, zerolinecolor=GRID_COLOR, automargin=True),
+    yaxis=dict(gridcolor=GRID_COLOR, zerolinecolor=GRID_COLOR, automargin=True),
+    hoverlabel=dict(bgcolor='#1F3850', font_color=FONT_COLOR),
+    showlegend=False,
+))
+
+
+def payload_nbytes(fig):
+    """Size of the figure JSON sent to the browser."""
+    return len(pio.to_json(fig, validate=False))
+
+
+def _themed(fig, title):
+    fig.update_layout(template=DASHBOARD_TEMPLATE, title_text=title)
+    return fig
+
+
+# --- Chart Builders ---
+def pie_chart(counts, title, colors):
+    """Pie of a Series of counts indexed by category."""
+    fig = go.Figure(go.Pie(
+        labels=counts.index.tolist(),
+        values=counts.tolist(),
+        marker=dict(colors=list(colors)[:len(counts)]),
+        hovertemplate='%{label}: %{value:,}<extra></extra>',
+    ))
+    fig.update_layout(showlegend=True)
+    return _themed(fig, title)
+
+
+def horizontal_bar_chart(values, title, x_title, y_title, colors):
+    """Single-trace horizontal bar of a Series indexed by category, drawn top-down in reverse order.
+
+    Each bar gets its own colour from ``colors`` through ``marker.color`` rather
+    than one trace per category, so the figure stays one trace however many
+    categories there are.
+    """
+    colors = list(colors)
+    fig = go.Figure(go.Bar(
+        x=values.tolist(),
+        y=[str(label) for label in values.index],
+        orientation='h',
+        marker_color=[colors[i % len(colors)] for i in range(len(values))],
+        hovertemplate='%{y}: %{x:,}<extra></extra>',
+    ))
+    fig.update_layout(xaxis_title=x_title, yaxis_title=y_title)
+    return _themed(fig, title)
+
+
+def line_chart(frame, x, y, title, x_title, y_title, color, markers=False):
+    """Single-trace line chart of ``y`` over ``x``."""
+    fig = go.Figure(go.Scatter(
+        x=frame[x],
+        y=frame[y],
+        mode='lines+markers' if markers else 'lines',
+        line=dict(color=color),
+        hovertemplate='%{x|%d %b %Y}: %{y:,}<extra></extra>',
+    ))
+    fig.update_layout(xaxis_title=x_title, yaxis_title=y_title)
+    return _themed(fig, title)
+
+
+def geo_chart(frame, size, hover_name, title, lat='lat', lon='lon', size_max=20):
+    """Bubble map of ``size``, coloured on the same value.
+
+    Rows with coordinates are placed there; rows without them are matched by
+    Plotly against its country names (``hover_name`` as the country), and rows
+    matching no country are not drawn.
+    """
+    located = frame[lat].notna() & frame[lon].notna()
+    fig = px.scatter_geo(
+        frame[located],
+        lat=lat,
+        lon=lon,
+        size=size,
+        hover_name=hover_name,
+        color=size,
+        size_max=size_max,
+        projection="natural earth",
+        color_continuous_scale=px.colors.sequential.Plasma,
+    )
+    by_name = frame[~located]
+    if len(by_name):
+        fig.add_trace(go.Scattergeo(
+            locations=by_name[hover_name],
+            locationmode='country names',
+            hovertext=by_name[hover_name],
+            marker=dict(size=by_name[size], color=by_name[size], coloraxis='coloraxis', sizemode='area'),
+            hovertemplate=f'<b>%{{hovertext}}</b><br><br>{size}=%{{marker.color}}<extra></extra>',
+        ))
+    if len(frame):
+        # Both traces share one bubble scale, as px would give a single trace
+        fig.update_traces(marker_sizeref=frame[size].max() / size_max ** 2)
+    fig.update_layout(geo=dict(bgcolor=TRANSPARENT, lakecolor='#1F3850', landcolor='#0F1C3F',
+                               subunitcolor=GRID_COLOR, countrycolor=GRID_COLOR,
+                               showcountries=True, fitbounds='locations'))
+    return _themed(fig, title)
@@ -0,0 +1,143 @@
+# data_store.py
+
+import datetime
+import json
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow ships with streamlit, but keep the store optional
+    pa = None
+    feather = None
+
+DEFAULT_STORE_DIR = os.environ.get(
+    'DASHBOARD_DATASET_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dataset_store'),
+)
+# Stored datasets unused for longer than the age limit are deleted, and the least recently used
+# ones go first once the directory exceeds the size limit
+DEFAULT_STORE_MAX_BYTES = int(os.environ.get('DASHBOARD_DATASET_STORE_MAX_BYTES', 10 * 1024 ** 3))
+DEFAULT_STORE_MAX_AGE_DAYS = float(os.environ.get('DASHBOARD_DATASET_STORE_MAX_AGE_DAYS', 30))
+
+
+class DatasetStore:
+    """Directory of cleaned datasets saved as uncompressed Feather (Arrow IPC) files.
+
+    Uncompressed Arrow files can be memory-mapped, so reopening a dataset reads
+    column buffers straight from the page cache instead of re-parsing a CSV.
+    Each dataset is stored as ``<key>.feather`` with a small ``<key>.json``
+    sidecar describing where it came from.
+
+    The store is bounded: ``prune`` (run after every save) deletes datasets
+    not used for ``max_age_days`` and then the least recently used ones until
+    the data files fit in ``max_bytes``. Loading a dataset marks it as used.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, max_bytes=DEFAULT_STORE_MAX_BYTES,
+                 max_age_days=DEFAULT_STORE_MAX_AGE_DAYS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+
+    @property
+    def available(self):
+        return feather is not None
+
+    def _data_path(self, key):
+        return os.path.join(self.root, f"{key}.feather")
+
+    def _meta_path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def __contains__(self, key):
+        return self.available and os.path.exists(self._data_path(key))
+
+    def save(self, key, df, source_name=None, report=None):
+        if not self.available:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        # Write to a temp file first so a crashed write never leaves a truncated dataset.
+        data_path = self._data_path(key)
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, data_path)
+
+        meta = {
+            'key': key,
+            'source_name': source_name,
+            'rows': len(df),
+            'saved_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'report': report or {},
+        }
+        with open(self._meta_path(key), 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh)
+        self.prune(keep=(key,))
+
+    def load(self, key):
+        data_path = self._data_path(key)
+        os.utime(data_path)  # last use, for eviction
+        table = feather.read_table(data_path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def remove(self, key):
+        # Datasets already memory-mapped by a session stay readable after their file is unlinked
+        for path in (self._data_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _stored(self):
+        """``(key, bytes, last_used)`` of every stored dataset."""
+        if not self.available or not os.path.isdir(self.root):
+            return []
+        stored = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.feather'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            stored.append((name[:-len('.feather')], stat.st_size, stat.st_mtime))
+        return stored
+
+    @property
+    def total_bytes(self):
+        return sum(nbytes for _, nbytes, _ in self._stored())
+
+    def prune(self, keep=()):
+        """Delete datasets past the age limit, then the least recently used ones over the size
+        limit; keys in ``keep`` are never deleted. Returns the deleted keys."""
+        cutoff = time.time() - self.max_age_days * 24 * 3600
+        removed = []
+        total = 0
+        for key, nbytes, last_used in sorted(self._stored(), key=lambda entry: entry[2], reverse=True):
+            if key not in keep and (last_used < cutoff or total + nbytes > self.max_bytes):
+                self.remove(key)
+                removed.append(key)
+            else:
+                total += nbytes
+        return removed
+
+    def metadata(self, key):
+        try:
+            with open(self._meta_path(key), encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def list_datasets(self, keys=None):
+        """Metadata (plus ``bytes``) of every stored dataset, or only of ``keys``, newest first."""
+        datasets = []
+        for key, nbytes, _ in self._stored():
+            if keys is not None and key not in keys:
+                continue
+            meta = self.metadata(key)
+            if meta:
+                datasets.append({**meta, 'bytes': nbytes})
+        return sorted(datasets, key=lambda meta: meta.get('saved_at') or '', reverse=True)
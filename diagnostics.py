@@ -0,0 +1,113 @@
+# diagnostics.py
+
+import contextlib
+import json
+import logging
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger('dashboard.diagnostics')
+
+
+def configure_logging():
+    """Send stage records to stderr even when nothing else configured logging."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+# tracemalloc is process-wide and slows every allocation while it runs, so it is started when
+# the first stage opens (in any session) and stopped again when the last open stage closes.
+_tracing_lock = threading.Lock()
+_open_stages = 0
+_tracing_started = False  # whether tracing was started here, and is therefore ours to stop
+
+
+def _start_tracing():
+    global _open_stages, _tracing_started
+    with _tracing_lock:
+        if _open_stages == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _open_stages += 1
+
+
+def _stop_tracing():
+    global _open_stages, _tracing_started
+    with _tracing_lock:
+        _open_stages -= 1
+        if _open_stages == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+def no_stage(name, **context):
+    """Stand-in for ``StageRecorder.stage`` when diagnostics are off."""
+    return contextlib.nullcontext(context)
+
+
+class StageRecorder:
+    """Wall time and peak memory growth of each named stage of a rerun.
+
+    Memory is measured with tracemalloc, which only runs while some stage is
+    open and is process-wide: allocations made by other sessions during a
+    stage count too, so the figures are indicative. Nested stages are
+    supported; a parent's peak includes its children's. Each finished stage is also logged as one
+    JSON line on the ``dashboard.diagnostics`` logger.
+    """
+
+    def __init__(self, **context):
+        self.context = context  # e.g. session and dataset, added to every record
+        self.records = []
+        self._local = threading.local()  # stack of open stages per thread
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextlib.contextmanager
+    def stage(self, name, **context):
+        stack = self._stack()
+        _start_tracing()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Resetting the peak below would lose the parent's peak so far
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        frame = {'peak': current}
+        stack.append(frame)
+        # Reserve the record's place now so nested stages are listed after their parent
+        record = {'stage': name}
+        self.records.append(record)
+        start = time.perf_counter()
+        try:
+            yield context
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            _stop_tracing()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            record.update({
+                'seconds': round(seconds, 6),
+                'peak_memory_delta': max(peak - current, 0),
+                'depth': len(stack),
+                **self.context,
+                **context,
+            })
+            logger.info(json.dumps({'event': 'dashboard_stage', **record}, default=str))
+
+    def extend(self, records):
+        """Add finished records from another recorder (e.g. a background job's), nested under the
+        stage currently open on this thread."""
+        depth = len(self._stack())
+        self.records.extend({**record, 'depth': record.get('depth', 0) + depth} for record in records)
+
+    def clear(self):
+        self.records = []
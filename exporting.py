@@ -0,0 +1,247 @@
+# exporting.py
+
+import gzip
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is offered only when pyarrow is installed
+    pa = None
+    pq = None
+
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXCEL_SHEET_NAME = 'Filtered_Data'
+# Rows per worksheet including the header row; larger exports continue on extra sheets
+EXCEL_MAX_ROWS = 1_048_576
+# From this many rows the workbook is written row by row in xlsxwriter's constant_memory mode
+EXCEL_CONSTANT_MEMORY_MIN_ROWS = 50_000
+EXPORT_CHUNK_ROWS = 50_000
+# Streamlit keeps a download's whole content in server memory (its media file storage takes
+# bytes, even from a file handle), so files are written in chunks but served whole, up to this size
+EXPORT_MAX_BYTES = 512 * 1024 ** 2
+# Rows written to estimate an export's size before generating it
+EXPORT_ESTIMATE_SAMPLE_ROWS = 2000
+
+EXPORT_FORMATS = {
+    'xlsx': {'label': 'Excel', 'suffix': '.xlsx', 'mime': EXCEL_MIME},
+    'csv': {'label': 'CSV', 'suffix': '.csv', 'mime': 'text/csv'},
+    'csv.gz': {'label': 'CSV (gzip)', 'suffix': '.csv.gz', 'mime': 'application/gzip'},
+}
+if pq is not None:
+    EXPORT_FORMATS['parquet'] = {'label': 'Parquet', 'suffix': '.parquet', 'mime': 'application/vnd.apache.parquet'}
+
+
+# --- Row Chunks ---
+def count_rows(df, rows=None):
+    if rows is None:
+        return len(df)
+    if isinstance(rows, slice):
+        return len(range(*rows.indices(len(df))))
+    return len(rows)
+
+
+def iter_row_chunks(df, rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield ``df.iloc[rows]`` in pieces, so a filtered view is never materialised in full.
+
+    ``rows`` is what FilterIndex.select returns: None (all rows), a slice or
+    an array of row positions.
+    """
+    if rows is None:
+        rows = slice(0, len(df))
+    if isinstance(rows, slice):
+        start, stop, _ = rows.indices(len(df))
+        for chunk_start in range(start, stop, chunk_rows):
+            yield df.iloc[chunk_start:min(chunk_start + chunk_rows, stop)]
+    else:
+        for chunk_start in range(0, len(rows), chunk_rows):
+            yield df.iloc[rows[chunk_start:chunk_start + chunk_rows]]
+
+
+# --- Writers ---
+def write_export(df, path, export_format, rows=None):
+    """Write the selected ``rows`` of ``df`` to ``path`` in one of EXPORT_FORMATS, chunk by chunk."""
+    if export_format == 'xlsx':
+        write_excel(df, path, rows=rows)
+    elif export_format == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as fh:
+            write_csv_chunks(df, fh, rows=rows)
+    elif export_format == 'csv.gz':
+        with gzip.open(path, 'wt', newline='', encoding='utf-8') as fh:
+            write_csv_chunks(df, fh, rows=rows)
+    elif export_format == 'parquet':
+        write_parquet(df, path, rows=rows)
+    else:
+        raise ValueError(f"Format ekspor tidak dikenal: {export_format}")
+
+
+def write_csv_chunks(df, fh, rows=None):
+    for number, chunk in enumerate(iter_row_chunks(df, rows)):
+        chunk.to_csv(fh, index=False, header=number == 0)
+    if count_rows(df, rows) == 0:
+        df.iloc[:0].to_csv(fh, index=False)
+
+
+def write_parquet(df, path, rows=None):
+    writer = None
+    try:
+        for chunk in iter_row_chunks(df, rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(df.iloc[:0], preserve_index=False), path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_excel(df, path, rows=None):
+    if count_rows(df, rows) < EXCEL_CONSTANT_MEMORY_MIN_ROWS:
+        selected = df if rows is None else df.iloc[rows]
+        with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+            selected.to_excel(writer, index=False, sheet_name=EXCEL_SHEET_NAME)
+    else:
+        write_excel_constant_memory(df, path, rows=rows)
+
+
+def write_excel_constant_memory(df, path, rows=None):
+    """Write rows with xlsxwriter's constant_memory mode, splitting across sheets at Excel's row limit.
+
+    pandas' ``to_excel`` emits cells column by column, which constant_memory
+    cannot handle, so rows are written directly here and each row is flushed
+    to disk as soon as the next one starts.
+    """
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True})
+    try:
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+        datetime_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+        header = [str(col) for col in df.columns]
+        datetime_columns = {
+            position for position, dtype in enumerate(df.dtypes)
+            if pd.api.types.is_datetime64_any_dtype(dtype)
+        }
+
+        sheet_number = 1
+        worksheet = workbook.add_worksheet(EXCEL_SHEET_NAME)
+        worksheet.write_row(0, 0, header, header_format)
+        row_number = 1
+        for chunk in iter_row_chunks(df, rows):
+            chunk = chunk.astype(object)
+            chunk = chunk.where(chunk.notna(), None)
+            for row in chunk.itertuples(index=False, name=None):
+                if row_number == EXCEL_MAX_ROWS:
+                    sheet_number += 1
+                    worksheet = workbook.add_worksheet(f"{EXCEL_SHEET_NAME}_{sheet_number}")
+                    worksheet.write_row(0, 0, header, header_format)
+                    row_number = 1
+                for col_number, value in enumerate(row):
+                    if value is None:
+                        continue
+                    if col_number in datetime_columns:
+                        worksheet.write_datetime(row_number, col_number, value.to_pydatetime(), datetime_format)
+                    else:
+                        worksheet.write(row_number, col_number, value)
+                row_number += 1
+    finally:
+        workbook.close()
+
+
+# --- Size Estimate ---
+def estimate_export_bytes(df, num_rows, export_format, sample_rows=EXPORT_ESTIMATE_SAMPLE_ROWS):
+    """Approximate size of an export of ``num_rows`` rows of ``df``, without writing it.
+
+    Evenly spaced sample rows are written twice, all of them and half of them;
+    the difference gives the bytes per extra row, net of each format's fixed
+    overhead. Spread-out rows compress worse than neighbouring ones, so for
+    compressed formats the estimate errs on the large side.
+    """
+    if num_rows == 0 or len(df) == 0:
+        return 0
+    positions = np.linspace(0, len(df) - 1, min(sample_rows, len(df), num_rows)).astype('int64')
+    with tempfile.TemporaryDirectory() as directory:
+        sizes = []
+        for number, sample in enumerate([positions[::2], positions]):
+            path = os.path.join(directory, f"sample{number}{EXPORT_FORMATS[export_format]['suffix']}")
+            write_export(df, path, export_format, rows=sample)
+            sizes.append((len(sample), os.path.getsize(path)))
+    (half_rows, half_bytes), (rows, nbytes) = sizes
+    if rows == half_rows:
+        return nbytes
+    bytes_per_row = max(nbytes - half_bytes, 0) / (rows - half_rows)
+    return int(nbytes + bytes_per_row * (num_rows - rows))
+
+
+# --- Export Cache ---
+class ExportCache:
+    """LRU of generated export files on disk, keyed by dataset and filter state.
+
+    Files are only generated when a download is requested and are deleted
+    when evicted, so repeated downloads of the same filtered view reuse the
+    existing file.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=2 * 1024 ** 3, directory=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory or tempfile.mkdtemp(prefix='dashboard_exports_')
+        self._entries = OrderedDict()  # key -> (path, nbytes)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(entry[0]):
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_or_create(self, key, suffix, writer):
+        """Path of the export for ``key``, calling ``writer(path)`` to create it if needed."""
+        path = self.get(key)
+        if path is not None:
+            return path
+
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                path = self.get(key)
+                if path is None:
+                    fd, path = tempfile.mkstemp(suffix=suffix, dir=self.directory)
+                    os.close(fd)
+                    try:
+                        writer(path)
+                    except BaseException:
+                        os.remove(path)
+                        raise
+                    self._add(key, path)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return path
+
+    def _add(self, key, path):
+        nbytes = os.path.getsize(path)
+        with self._lock:
+            self._entries[key] = (path, nbytes)
+            self._total_bytes += nbytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                _, (old_path, old_nbytes) = self._entries.popitem(last=False)
+                self._total_bytes -= old_nbytes
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
@@ -0,0 +1,144 @@
+# filters.py
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# --- Filter Dimensions ---
+FILTER_DIMENSIONS = ['platform', 'sentiment', 'media_type', 'location']
+# Dimensions with at most this many distinct values get one packed bitmap per value;
+# wider ones (typically location) are filtered through a lookup table over category codes.
+BITMAP_MAX_VALUES = 64
+
+
+class FilterIndex:
+    """Precomputed per-value row bitmaps plus a sorted date index for the sidebar filters.
+
+    Built once per dataset, which must be sorted by ``date``. The date range
+    becomes a contiguous row slice found by binary search; within that slice,
+    selections are OR-ed within a dimension and AND-ed across dimensions on
+    packed bitmaps (one bit per row), and only the final set of row positions
+    is used to materialise the filtered frame.
+
+    Dimensions with more than ``bitmap_max_values`` values skip the bitmaps and
+    are filtered through their category codes; the rollup cube passes 0, since
+    its cells are few enough that the bitmaps would cost more than they save.
+    """
+
+    def __init__(self, df, bitmap_max_values=BITMAP_MAX_VALUES):
+        self.num_rows = len(df)
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+        if self.num_rows > 1 and (dates[1:] < dates[:-1]).any():
+            raise ValueError("FilterIndex requires a frame sorted by 'date'")
+        # Repeated dates (day-truncated uploads, rollup cells) are kept as runs: each distinct
+        # date plus the row its run starts at, with the row count appended as the last start.
+        run_starts = np.flatnonzero(np.concatenate([[True], dates[1:] != dates[:-1]])) if self.num_rows else dates[:0]
+        if 2 * len(run_starts) <= self.num_rows:
+            self.dates = dates[run_starts]
+            self.date_starts = np.append(run_starts, self.num_rows)
+        else:
+            self.dates = dates
+            self.date_starts = None
+
+        self.values = {}    # dim -> list of category values
+        self.codes = {}     # dim -> category code per row (-1 = missing)
+        self.bitmaps = {}   # dim -> {value: packed uint8 bitmap}
+
+        for dim in FILTER_DIMENSIONS:
+            if dim not in df.columns:
+                continue
+            column = df[dim]
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype('category')
+            categories = column.cat.categories.tolist()
+            codes = column.cat.codes.to_numpy()
+            self.values[dim] = categories
+            self.codes[dim] = codes
+            if len(categories) <= bitmap_max_values:
+                self.bitmaps[dim] = {
+                    value: np.packbits(codes == code) for code, value in enumerate(categories)
+                }
+
+    @property
+    def nbytes(self):
+        bitmap_bytes = sum(bitmap.nbytes for bitmaps in self.bitmaps.values() for bitmap in bitmaps.values())
+        code_bytes = sum(codes.nbytes for codes in self.codes.values())  # copies, not views of the frame
+        date_bytes = self.dates.nbytes + (0 if self.date_starts is None else self.date_starts.nbytes)
+        return bitmap_bytes + code_bytes + date_bytes
+
+    def normalize(self, selections):
+        """Canonical form of ``selections``: unknown values dropped, sorted, and a
+        selection of every value of a dimension collapsed to ``None`` (no filter)."""
+        normalized = {}
+        for dim, selected_values in selections.items():
+            if selected_values is None or dim not in self.values:
+                normalized[dim] = None
+                continue
+            known = set(self.values[dim])
+            selected = sorted({value for value in selected_values if value in known}, key=str)
+            normalized[dim] = None if len(selected) == len(known) else selected
+        return normalized
+
+    def date_rows(self, start_date, end_date):
+        """Half-open row range ``(lo, hi)`` covering ``start_date <= date <= end_date`` (whole days)."""
+        start = np.datetime64(start_date, 'ns')
+        end = np.datetime64(end_date + datetime.timedelta(days=1), 'ns')
+        lo = int(np.searchsorted(self.dates, start, side='left'))
+        hi = int(np.searchsorted(self.dates, end, side='left'))
+        if self.date_starts is not None:
+            lo, hi = int(self.date_starts[lo]), int(self.date_starts[hi])
+        return lo, max(lo, hi)
+
+    def _dimension_bits(self, dim, selected_values, byte_lo, byte_hi):
+        if dim in self.bitmaps:
+            dim_bits = np.zeros(byte_hi - byte_lo, dtype=np.uint8)
+            for value in selected_values:
+                bitmap = self.bitmaps[dim].get(value)
+                if bitmap is not None:
+                    np.bitwise_or(dim_bits, bitmap[byte_lo:byte_hi], out=dim_bits)
+            return dim_bits
+
+        lookup = np.zeros(len(self.values[dim]) + 1, dtype=bool)  # last slot catches code -1
+        value_codes = {value: code for code, value in enumerate(self.values[dim])}
+        for value in selected_values:
+            if value in value_codes:
+                lookup[value_codes[value]] = True
+        return np.packbits(lookup[self.codes[dim][byte_lo * 8:byte_hi * 8]])
+
+    def select(self, selections, date_range=None):
+        """Rows matching ``selections`` ({dim: values or None}) within ``date_range``.
+
+        A ``None`` selection leaves the dimension unfiltered; an empty list
+        matches nothing. Returns a ``slice`` when only the date range applies,
+        otherwise an array of row positions.
+        """
+        lo, hi = self.date_rows(*date_range) if date_range is not None else (0, self.num_rows)
+        byte_lo, byte_hi = lo // 8, (hi + 7) // 8
+
+        bits = None
+        for dim, selected_values in selections.items():
+            if selected_values is None or dim not in self.values:
+                continue
+            dim_bits = self._dimension_bits(dim, selected_values, byte_lo, byte_hi)
+            bits = dim_bits if bits is None else np.bitwise_and(bits, dim_bits, out=bits)
+
+        if bits is None:
+            return slice(lo, hi)
+        positions = np.flatnonzero(np.unpackbits(bits, count=(byte_hi - byte_lo) * 8)) + byte_lo * 8
+        return positions[(positions >= lo) & (positions < hi)]
+
+    def apply(self, df, selections, date_range=None):
+        rows = self.select(selections, date_range=date_range)
+        if isinstance(rows, slice) and rows == slice(0, self.num_rows):
+            return df
+        return df.iloc[rows]
+
+
+def filter_state_key(selections, date_range=None):
+    """Hashable key for a filter state, independent of selection order."""
+    dims = tuple(
+        (dim, None if values is None else tuple(sorted(set(values), key=str)))
+        for dim, values in sorted(selections.items())
+    )
+    return dims + (None if date_range is None else tuple(str(bound) for bound in date_range),)
@@ -0,0 +1,63 @@
+# geocoding.py
+
+import functools
+import os
+import re
+
+import pandas as pd
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.csv')
+# When two places share a name (e.g. the province and the city of Jambi), the first kind here wins
+PLACE_KIND_PRIORITY = ['country', 'province', 'city']
+# Administrative prefixes tried away when the full name is not in the gazetteer ("Kota Bandung" -> "bandung")
+ADMIN_PREFIX_PATTERN = re.compile(r'^(kota|kabupaten|kab|provinsi|prov|propinsi)\.?\s+')
+
+
+def normalize_place_names(names):
+    """Lookup key for each name: case-folded, without punctuation, single-spaced."""
+    names = pd.Series(names, dtype='string')
+    return (
+        names.str.casefold()
+        .str.replace('.', '', regex=False)  # "D.I. Yogyakarta" -> "di yogyakarta"
+        .str.replace(r"[^\w\s-]", ' ', regex=True)
+        .str.replace(r'[\s_-]+', ' ', regex=True)
+        .str.strip()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Bundled gazetteer as a frame with one row per lookup key (names and aliases).
+
+    Read from disk once per process; every dataset's lookup reuses the result.
+    """
+    places = pd.read_csv(path, keep_default_na=False, dtype={'lat': 'float64', 'lon': 'float64'})
+    places['rank'] = places['kind'].map({kind: rank for rank, kind in enumerate(PLACE_KIND_PRIORITY)})
+
+    names = places[['name', 'kind', 'country', 'lat', 'lon', 'rank']].assign(alias=places['name'])
+    aliases = places.assign(alias=places['aliases'].str.split('|')).explode('alias')
+    aliases = aliases[aliases['alias'].str.strip() != '']
+    lookup = pd.concat([names, aliases[names.columns]], ignore_index=True)
+
+    lookup['key'] = normalize_place_names(lookup['alias'])
+    lookup = lookup.sort_values(['rank', 'key'], kind='stable').drop_duplicates('key')
+    return lookup.set_index('key')[['name', 'kind', 'country', 'lat', 'lon']]
+
+
+def resolve_locations(locations, path=GAZETTEER_PATH):
+    """Gazetteer match for each distinct location name, in one join over all of them.
+
+    Returns a frame indexed by location with the matched ``name``, ``kind``,
+    ``country``, ``lat`` and ``lon``; unmatched locations have missing values.
+    Names are looked up as given first and then without an administrative
+    prefix (Kota, Kabupaten, Provinsi).
+    """
+    gazetteer = load_gazetteer(path)
+    locations = pd.Index(pd.unique(pd.Series(locations, dtype='object').dropna()), name='location')
+    keys = normalize_place_names(locations.astype(str))
+    bare_keys = keys.str.replace(ADMIN_PREFIX_PATTERN, '', regex=True)
+    keys = keys.where(keys.isin(gazetteer.index), bare_keys)
+
+    resolved = gazetteer.reindex(keys.to_numpy())
+    resolved.index = locations
+    return resolved
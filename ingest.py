@@ -0,0 +1,779 @@
+# ingest.py
+
+import hashlib
+import io
+import os
+import threading
+import warnings
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    guess_datetime_format = None
+
+from aggregations import RollupCube, build_rollup, combine_rollups
+from diagnostics import no_stage
+from filters import FilterIndex
+from geocoding import resolve_locations
+
+# --- Expected Input Schema ---
+REQUIRED_COLUMNS = ['date', 'platform', 'sentiment', 'location', 'engagements', 'media_type']
+
+
+def file_digest(file_bytes):
+    """Content hash used as the cache key for an uploaded file."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+# --- Date Parsing ---
+# Tried against a sample of each upload's distinct date strings; the best match is used for
+# a vectorised parse and only the values it cannot read go to the slow per-element parser.
+# When a sample fits both a day-first and a month-first format equally, the earlier one here
+# wins, so the local dd/mm convention is preferred over mm/dd.
+COMMON_DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y/%m/%d',
+    '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%d/%m/%Y %H:%M', '%m/%d/%Y %H:%M',
+    '%d %b %Y', '%d %B %Y', '%b %d, %Y', '%B %d, %Y',
+]
+DATE_FORMAT_SAMPLE = 500
+# Files read in pieces infer their date format up front from this many evenly spaced windows
+DATE_SAMPLE_WINDOWS = 64
+DATE_SAMPLE_WINDOW_BYTES = 64 * 1024
+# Distinct date strings remembered across chunks; exports with per-second timestamps skip the cache
+DATE_CACHE_MAX_ENTRIES = 100_000
+
+
+def _evenly_spaced(values, count):
+    if len(values) <= count:
+        return list(values)
+    return [values[position] for position in np.linspace(0, len(values) - 1, count).astype(int)]
+
+
+def _to_datetime(values, fmt):
+    try:
+        return pd.to_datetime(values, format=fmt, errors='coerce')
+    except ValueError:  # mixed UTC offsets
+        return pd.to_datetime(values, format=fmt, errors='coerce', utc=True)
+
+
+def _parsed_count(values, fmt):
+    return int(_to_datetime(pd.Series(values, dtype=object), fmt).notna().sum())
+
+
+def swap_day_month(fmt):
+    """``fmt`` with ``%d`` and ``%m`` exchanged ('%d/%m/%Y' -> '%m/%d/%Y'), or None if it lacks either."""
+    if fmt is None or '%d' not in fmt or '%m' not in fmt:
+        return None
+    return fmt.replace('%d', '\0').replace('%m', '%d').replace('\0', '%m')
+
+
+def is_dayfirst(fmt):
+    return swap_day_month(fmt) is not None and fmt.index('%d') < fmt.index('%m')
+
+
+def is_year_day_month(fmt):
+    """True for year-first formats with the day before the month ('%Y-%d-%m'), which no real export uses."""
+    return is_dayfirst(fmt) and '%Y' in fmt and fmt.index('%Y') < fmt.index('%d')
+
+
+def infer_date_format(sample):
+    """Pick the strftime format that parses the most values of ``sample`` (a list of strings).
+
+    Candidates are scored on up to DATE_FORMAT_SAMPLE evenly spaced values. If
+    the winner's day/month-swapped twin reads more of the full sample (e.g. a
+    single '25/03/2024' among many '03/04/2024'), the twin is used instead.
+    Year-first strings are always read year-month-day, even when every day is <= 12.
+    """
+    sample = list(sample)
+    scored = _evenly_spaced(sample, DATE_FORMAT_SAMPLE)
+    candidates = list(COMMON_DATE_FORMATS)
+    if guess_datetime_format is not None and scored:
+        with warnings.catch_warnings():
+            # "Parsing dates in %d/%m/%Y format when dayfirst=False": both conventions are tried anyway
+            warnings.simplefilter('ignore', UserWarning)
+            candidates += [guess_datetime_format(scored[0], dayfirst=dayfirst) for dayfirst in (True, False)]
+
+    best_format, best_parsed = None, 0
+    for fmt in dict.fromkeys(fmt for fmt in candidates if fmt and not is_year_day_month(fmt)):
+        parsed = _parsed_count(scored, fmt)
+        if parsed > best_parsed:
+            best_format, best_parsed = fmt, parsed
+
+    swapped = swap_day_month(best_format)
+    if swapped is not None and not is_year_day_month(swapped) and len(sample) > len(scored):
+        if _parsed_count(sample, swapped) > _parsed_count(sample, best_format):
+            best_format = swapped
+    return best_format
+
+
+def sample_csv_dates(file_bytes, windows=DATE_SAMPLE_WINDOWS, window_bytes=DATE_SAMPLE_WINDOW_BYTES):
+    """Distinct ``date`` strings from evenly spaced windows across a whole CSV.
+
+    Readers that parse a file in pieces infer the date format from this sample
+    first, so a file sorted by date does not get its format fixed by a first
+    piece whose days are all <= 12. A window starting inside a quoted field
+    may misread a few rows; those values simply fail to parse in every format.
+    """
+    header_end = file_bytes.find(b'\n') + 1
+    if header_end == 0:
+        return []
+    try:
+        columns = list(normalize_columns(pd.read_csv(io.BytesIO(file_bytes[:header_end]), nrows=0)).columns)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+        return []
+    if 'date' not in columns:
+        return []
+
+    total = len(file_bytes)
+    if total - header_end <= windows * window_bytes:
+        starts = [header_end]
+        window_bytes = total - header_end
+    else:
+        starts = np.linspace(header_end, total - window_bytes, windows).astype(int).tolist()
+
+    values = []
+    for start in starts:
+        end = min(start + window_bytes, total)
+        if start > header_end:
+            start = file_bytes.find(b'\n', start, end) + 1  # skip the partial first line
+            if start == 0:
+                continue
+        if end < total:
+            end = file_bytes.rfind(b'\n', start, end) + 1  # and the partial last one
+        if end <= start:
+            continue
+        try:
+            window = pd.read_csv(io.BytesIO(file_bytes[start:end]), header=None, usecols=[columns.index('date')],
+                                 dtype=str, on_bad_lines='skip')
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError, ValueError):
+            continue
+        values.append(window.iloc[:, 0].dropna())
+    if not values:
+        return []
+    return pd.unique(pd.concat(values, ignore_index=True)).tolist()
+
+
+def _naive_datetimes(values):
+    values = pd.DatetimeIndex(values)
+    if values.tz is not None:
+        values = values.tz_localize(None)  # keep wall-clock dates, as .dt.date would
+    return values.astype('datetime64[ns]')
+
+
+def _parse_mixed(values, dayfirst=False):
+    try:
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed', dayfirst=dayfirst)
+    except (TypeError, ValueError):
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed', dayfirst=dayfirst, utc=True)
+    if not pd.api.types.is_datetime64_any_dtype(parsed):  # mixed offsets come back as objects
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed', dayfirst=dayfirst, utc=True)
+    return _naive_datetimes(parsed)
+
+
+class DateParser:
+    """Parses the ``date`` column of one upload, chunk by chunk.
+
+    Each distinct string is parsed once: values seen in earlier chunks come
+    from a cache, the rest are parsed vectorised with ``date_format`` (inferred
+    from the first chunk unless given; readers that split a file pass one
+    inferred from ``sample_csv_dates``), and only strings that do not match it
+    fall back to per-element parsing, with the same day/month order.
+    """
+
+    def __init__(self, date_format=None):
+        self.date_format = date_format
+        self._cache = pd.Series(dtype='datetime64[ns]')
+        self._fallback_values = pd.Index([], dtype=object)  # cached strings that needed the fallback
+
+    def parse(self, series):
+        """Return the parsed column (naive datetime64[ns], NaT when invalid) and parse counts."""
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            parsed = pd.Series(_naive_datetimes(pd.to_datetime(series, errors='coerce')), index=series.index)
+            invalid = int((parsed.isna() & series.notna()).sum())
+            return parsed, {'dates_fallback': 0, 'dates_invalid': invalid, 'dates_missing': int(series.isna().sum())}
+
+        codes, uniques = pd.factorize(series)
+        uniques = pd.Index(uniques, dtype=object)
+        parsed_uniques = self._cache.reindex(uniques)
+        is_new = ~uniques.isin(self._cache.index)
+        fallback_uniques = np.asarray(uniques.isin(self._fallback_values))
+
+        if is_new.any():
+            new_values = uniques[is_new]
+            if self.date_format is None:
+                self.date_format = infer_date_format(new_values.tolist())
+            if self.date_format is not None:
+                new_parsed = _naive_datetimes(_to_datetime(new_values, self.date_format))
+            else:
+                new_parsed = pd.DatetimeIndex(np.full(len(new_values), np.datetime64('NaT', 'ns')))
+
+            unmatched = np.asarray(new_parsed.isna()) & (new_values.astype(str).str.strip() != '')
+            if unmatched.any():
+                new_parsed = new_parsed.to_numpy().copy()
+                dayfirst = is_dayfirst(self.date_format)
+                new_parsed[unmatched] = _parse_mixed(new_values[unmatched], dayfirst=dayfirst).to_numpy()
+                new_parsed = pd.DatetimeIndex(new_parsed)
+                fallback_uniques[np.flatnonzero(is_new)[unmatched]] = True
+
+            parsed_uniques[is_new] = new_parsed.to_numpy()
+            if len(self._cache) + len(new_values) <= DATE_CACHE_MAX_ENTRIES:
+                self._cache = pd.concat([self._cache, pd.Series(new_parsed.to_numpy(), index=new_values)])
+                self._fallback_values = self._fallback_values.append(new_values[unmatched])
+
+        parsed_values = parsed_uniques.to_numpy(dtype='datetime64[ns]')
+        values = np.full(len(series), np.datetime64('NaT', 'ns'))
+        present = codes >= 0
+        values[present] = parsed_values[codes[present]]
+
+        rows_per_unique = np.bincount(codes[present], minlength=len(uniques))
+        stats = {
+            'dates_fallback': int(rows_per_unique[fallback_uniques & ~np.isnat(parsed_values)].sum()),
+            'dates_invalid': int(rows_per_unique[np.isnat(parsed_values)].sum()),
+            'dates_missing': int((~present).sum()),
+        }
+        return pd.Series(values, index=series.index, name=series.name), stats
+
+
+# --- Data Cleaning ---
+def normalize_columns(df):
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+    return df
+
+
+def clean_rows(df, date_parser=None):
+    """Row-level cleaning that can run independently on each chunk of a file.
+
+    Returns the cleaned frame and counts of rows read, dates that needed the
+    fallback parser, dates that could not be parsed, and rows dropped.
+    """
+    df = normalize_columns(df)
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+    rows_read = len(df)
+    date_parser = date_parser or DateParser()
+    df['date'], stats = date_parser.parse(df['date'])
+    df['engagements'] = pd.to_numeric(df['engagements'], errors='coerce').fillna(0).astype(int)
+    df.dropna(subset=['date'], inplace=True)
+
+    stats['rows_read'] = rows_read
+    stats['rows_dropped'] = rows_read - len(df)
+    stats['date_format'] = date_parser.date_format
+    return df, stats
+
+
+def merge_clean_stats(stats_list):
+    merged = {}
+    for stats in stats_list:
+        for name, value in stats.items():
+            if name == 'date_format':
+                merged.setdefault(name, value)
+            else:
+                merged[name] = merged.get(name, 0) + value
+    return merged
+
+
+def sort_by_date(df):
+    # Datasets are kept in date order so date ranges map to contiguous row slices
+    if df['date'].is_monotonic_increasing:
+        return df.reset_index(drop=True)
+    return df.sort_values('date', kind='stable', ignore_index=True)
+
+
+def read_media_csv(file_bytes, stage=no_stage):
+    """Read, clean and compact a whole CSV in one go. Returns the frame and an ingest report.
+
+    ``stage(name)`` (e.g. ``StageRecorder.stage``) wraps each step for diagnostics.
+    """
+    with stage('read_csv'):
+        raw = pd.read_csv(io.BytesIO(file_bytes))
+    with stage('cleaning'):
+        df, stats = clean_rows(raw)
+    with stage('compact_schema'):
+        df, report = apply_compact_schema(df)
+        df = sort_by_date(df)
+    report.update(stats)
+    report['memory_after'] = frame_nbytes(df)
+    return df, report
+
+
+# --- Chunked Ingest ---
+CHUNK_ROWS = 250_000
+# Uploads at least this large are read in chunks with a progress callback
+CHUNKED_INGEST_MIN_BYTES = 64 * 1024 ** 2
+
+
+def read_media_csv_chunked(file_bytes, chunksize=CHUNK_ROWS, progress=None, stage=no_stage):
+    """Read, clean and compact a CSV chunk by chunk.
+
+    Each chunk is cleaned and converted to the compact schema before the next
+    one is parsed, so peak memory stays close to the final compact size plus
+    one raw chunk. ``progress(rows_read, bytes_read, total_bytes)`` is called
+    after every chunk. Returns the frame and the same report as
+    ``read_media_csv``.
+    """
+    total_bytes = len(file_bytes)
+    buffer = io.BytesIO(file_bytes)
+    chunks = []
+    chunk_stats = []
+    rows_read = 0
+    memory_before = 0
+    # Shared so the parsed strings carry across chunks; the format comes from the whole file
+    date_parser = DateParser(date_format=infer_date_format(sample_csv_dates(file_bytes)))
+
+    with stage('read_and_clean_chunks'):
+        for raw_chunk in pd.read_csv(buffer, chunksize=chunksize):
+            rows_read += len(raw_chunk)
+            chunk, stats = clean_rows(raw_chunk, date_parser=date_parser)
+            memory_before += frame_nbytes(chunk)
+            chunks.append(apply_compact_schema(chunk)[0])
+            chunk_stats.append(stats)
+            if progress is not None:
+                progress(rows_read, min(buffer.tell(), total_bytes), total_bytes)
+
+    if not chunks:
+        raise ValueError("File CSV tidak berisi data.")
+    with stage('combine_chunks'):
+        df = sort_by_date(concat_compact(chunks))
+    report = {
+        'rows': len(df),
+        'memory_before': memory_before,
+        'memory_after': frame_nbytes(df),
+    }
+    report.update(merge_clean_stats(chunk_stats))
+    return df, report
+
+
+# --- Parallel Ingest ---
+# Uploads at least this large are split into byte ranges and parsed in a process pool
+PARALLEL_INGEST_MIN_BYTES = 256 * 1024 ** 2
+PARALLEL_RANGE_BYTES = 64 * 1024 ** 2
+
+
+def split_csv_ranges(file_bytes, range_bytes=PARALLEL_RANGE_BYTES):
+    """Split a CSV body into ``(start, end)`` byte ranges that end on record boundaries.
+
+    A newline only ends a record when it is outside a quoted field, i.e. when
+    the number of ``"`` characters since the previous boundary is even.
+    Returns the header length and the ranges, or ``None`` if the header
+    itself cannot be split safely.
+    """
+    header_end = file_bytes.find(b'\n') + 1
+    if header_end == 0 or file_bytes.count(b'"', 0, header_end) % 2:
+        return None
+
+    total = len(file_bytes)
+    ranges = []
+    start = header_end
+    while start < total:
+        end = min(start + range_bytes, total)
+        quotes = file_bytes.count(b'"', start, end)
+        while end < total:
+            newline = file_bytes.find(b'\n', end)
+            if newline == -1:
+                end = total
+                break
+            quotes += file_bytes.count(b'"', end, newline + 1)
+            end = newline + 1
+            if quotes % 2 == 0:
+                break
+        ranges.append((start, end))
+        start = end
+    return header_end, ranges
+
+
+def parse_csv_range(header_bytes, body_bytes, date_format=None):
+    """Worker: parse, clean and compact one byte range. Must stay importable for process pools.
+
+    ``date_format`` is inferred once for the whole file by the caller, so every
+    range reads ambiguous dates the same way.
+    """
+    chunk, stats = clean_rows(pd.read_csv(io.BytesIO(header_bytes + body_bytes)),
+                              date_parser=DateParser(date_format=date_format))
+    stats['memory_before'] = frame_nbytes(chunk)
+    return apply_compact_schema(chunk)[0], stats
+
+
+def read_media_csv_parallel(file_bytes, executor, max_in_flight=None, range_bytes=PARALLEL_RANGE_BYTES, progress=None,
+                            stage=no_stage):
+    """Parse a large CSV on ``executor`` (ideally a process pool), one byte range per task.
+
+    At most ``max_in_flight`` ranges are submitted at once so the copies sent to
+    workers stay bounded. The date format is inferred here from a sample of the
+    whole file and handed to every range. Falls back to chunked reading when the file cannot
+    be split. Returns the frame and the same report as ``read_media_csv``.
+    """
+    split = split_csv_ranges(file_bytes, range_bytes)
+    if split is None or len(split[1]) < 2:
+        return read_media_csv_chunked(file_bytes, progress=progress, stage=stage)
+    header_end, ranges = split
+    header_bytes = file_bytes[:header_end]
+    date_format = infer_date_format(sample_csv_dates(file_bytes))
+    max_in_flight = max_in_flight or 2 * (os.cpu_count() or 1)
+
+    results = [None] * len(ranges)
+    pending = {}
+    next_range = 0
+    rows_read = 0
+    bytes_read = header_end
+    with stage('parse_ranges'):
+        try:
+            while next_range < len(ranges) or pending:
+                while next_range < len(ranges) and len(pending) < max_in_flight:
+                    start, end = ranges[next_range]
+                    future = executor.submit(parse_csv_range, header_bytes, file_bytes[start:end], date_format)
+                    pending[future] = next_range
+                    next_range += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    results[index] = future.result()
+                    rows_read += len(results[index][0])
+                    bytes_read += ranges[index][1] - ranges[index][0]
+                    if progress is not None:
+                        progress(rows_read, bytes_read, len(file_bytes))
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    with stage('combine_chunks'):
+        df = sort_by_date(concat_compact([chunk for chunk, _ in results]))
+    report = merge_clean_stats([stats for _, stats in results])
+    report['rows'] = len(df)
+    report['memory_after'] = frame_nbytes(df)
+    return df, report
+
+
+def _missing_column(template, rows):
+    # All-missing stand-in for a column a chunk lacks, typed so it concatenates like ``template``
+    if isinstance(template.dtype, pd.CategoricalDtype):
+        return pd.Series(pd.Categorical.from_codes(np.full(rows, -1), dtype=template.dtype))
+    if template.dtype.kind in 'iuf':
+        return pd.Series(np.full(rows, np.nan), dtype='float32' if template.dtype.itemsize <= 4 else 'float64')
+    if template.dtype.kind in 'mM':
+        return pd.Series(np.full(rows, np.datetime64('NaT')), dtype=template.dtype)
+    return pd.Series([None] * rows, dtype=object)
+
+
+def concat_compact(chunks):
+    """Concatenate compact chunks column by column, merging categoricals without decoding them.
+
+    The result has the union of the chunks' columns, in order of first appearance;
+    a column missing from a chunk is missing (NA) in that chunk's rows.
+    """
+    columns = {}
+    for col in dict.fromkeys(col for chunk in chunks for col in chunk.columns):
+        template = next(chunk[col] for chunk in chunks if col in chunk.columns)
+        parts = [chunk[col] if col in chunk.columns else _missing_column(template, len(chunk)) for chunk in chunks]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            try:
+                columns[col] = pd.Series(union_categoricals(parts), name=col)
+                continue
+            except TypeError:  # e.g. an all-missing chunk with differently typed categories
+                pass
+        parts = [
+            part.astype(object) if isinstance(part.dtype, pd.CategoricalDtype) else part
+            for part in parts
+        ]
+        columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# --- Compact Schema ---
+CATEGORICAL_COLUMNS = ['platform', 'sentiment', 'media_type', 'location']
+# Extra text columns become categoricals when at most this share of values is distinct
+CATEGORY_MAX_RATIO = 0.5
+
+
+def apply_compact_schema(df):
+    """Convert a cleaned frame to compact dtypes in place.
+
+    Dimension columns become categoricals, ``date`` is datetime64[ns] and
+    ``engagements`` is int32 (int64 only if values would overflow). Other
+    numeric columns are downcast and low-cardinality text columns are
+    categorised. Returns the frame and a report of memory before and after.
+    """
+    memory_before = frame_nbytes(df)
+
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = series.astype('category')
+        elif col == 'date':
+            if isinstance(series.dtype, pd.DatetimeTZDtype):
+                series = series.dt.tz_localize(None)  # keep wall-clock dates, as .dt.date would
+            df[col] = series.astype('datetime64[ns]')
+        elif col == 'engagements':
+            if series.empty or series.abs().max() <= 2 ** 31 - 1:
+                df[col] = series.astype('int32')
+        elif pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='float')
+        elif (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)) and len(series):
+            if series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(series):
+                df[col] = series.astype('category')
+
+    report = {
+        'rows': len(df),
+        'memory_before': memory_before,
+        'memory_after': frame_nbytes(df),
+    }
+    return df, report
+
+
+# --- Dataset ---
+def combined_key(source_keys):
+    """Dataset key for a set of uploaded files: the file's own hash for a single file,
+    otherwise a hash of the sorted file hashes (so upload order does not matter)."""
+    source_keys = sorted(set(source_keys))
+    if len(source_keys) == 1:
+        return source_keys[0]
+    return hashlib.sha256('\n'.join(source_keys).encode()).hexdigest()
+
+
+def row_hashes(df, columns):
+    """64-bit hash of each row over ``columns``. Numeric columns are widened first, since the
+    compact schema may pick different widths for the same values in different files."""
+    key = df[list(columns)]
+    widths = {}
+    for col in key.columns:
+        if pd.api.types.is_integer_dtype(key[col]) and not pd.api.types.is_bool_dtype(key[col]):
+            widths[col] = 'int64'
+        elif pd.api.types.is_float_dtype(key[col]):
+            widths[col] = 'float64'
+    return pd.util.hash_pandas_object(key.astype(widths), index=False).to_numpy()
+
+
+def already_present(existing_hashes, hashes):
+    """Mask of ``hashes`` that repeat a row of ``existing_hashes``, as a multiset: a value found
+    k times among the existing rows marks at most its first k occurrences in ``hashes``."""
+    existing, existing_counts = np.unique(existing_hashes, return_counts=True)
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    occurrence = np.empty(len(hashes), dtype=np.int64)
+    occurrence[order] = np.arange(len(hashes)) - np.searchsorted(sorted_hashes, sorted_hashes, side='left')
+
+    if not len(existing):
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.minimum(np.searchsorted(existing, hashes), len(existing) - 1)
+    present_count = np.where(existing[positions] == hashes, existing_counts[positions], 0)
+    return occurrence < present_count
+
+
+class Dataset:
+    """A cleaned, compact, date-sorted frame together with what ingest learned about it.
+
+    Instances are shared between reruns and sessions, so ``df`` is read-only.
+    ``source_keys`` are the content hashes of the file(s) the rows came from.
+    """
+
+    def __init__(self, key, df, report=None, source_name=None, source_keys=None):
+        self.key = key
+        self.df = sort_by_date(df)
+        self.report = report or {}
+        self.source_name = source_name
+        self.source_keys = tuple(source_keys) if source_keys else (key,)
+        self.nbytes = frame_nbytes(df)
+        self._filter_index = None
+        self._cube = None
+        self._locations = None
+        self._row_hashes = (None, None)  # (columns, hashes) of the last row_hashes call
+
+    def build_indexes(self, stage=no_stage):
+        """Build the rollup cube and location matches now, so ingest pays for them rather
+        than the first render. Returns the dataset."""
+        with stage('build_indexes'):
+            self.cube
+            self.locations
+        return self
+
+    # Otherwise indexes are built lazily on first use; a duplicate build under a race is harmless.
+    # The raw-row filter index is only needed for exports, so ingest leaves it lazy.
+    @property
+    def filter_index(self):
+        if self._filter_index is None:
+            self._filter_index = FilterIndex(self.df)
+        return self._filter_index
+
+    @property
+    def cube(self):
+        if self._cube is None:
+            self._cube = RollupCube(self.df)
+        return self._cube
+
+    @property
+    def locations(self):
+        """Gazetteer match (name, kind, country, lat, lon) per distinct location value."""
+        if self._locations is None:
+            self._locations = resolve_locations(self.df['location'].unique())
+        return self._locations
+
+    def row_hashes(self, columns):
+        columns = tuple(columns)
+        if self._row_hashes[0] != columns:
+            self._row_hashes = (columns, row_hashes(self.df, columns))
+        return self._row_hashes[1]
+
+    def append(self, other):
+        """New Dataset with the rows of ``other`` that this one doesn't already contain.
+
+        The result has every column of either frame; columns only one file has
+        are missing in the other file's rows. Rows are compared on every column
+        the two frames share, and as multisets: if a row occurs k times here, only its first k occurrences
+        in ``other`` are dropped. Existing rows are reused as they are and, if
+        this dataset's rollup cube has been built, it is extended with a rollup
+        of the new rows only rather than rebuilt. The raw-row filter index is
+        rebuilt lazily on first use.
+        """
+        columns = [col for col in self.df.columns if col in other.df.columns]
+        other_hashes = other.row_hashes(columns)
+        is_new = ~already_present(self.row_hashes(columns), other_hashes)
+        new_rows = other.df[is_new]
+
+        report = merge_clean_stats([
+            {name: value for name, value in stats.items() if name != 'memory_after'}
+            for stats in (self.report, other.report)
+        ])
+        report['rows_duplicate'] = report.get('rows_duplicate', 0) + int((~is_new).sum())
+        source_keys = self.source_keys + tuple(k for k in other.source_keys if k not in self.source_keys)
+        source_name = ', '.join(name for name in (self.source_name, other.source_name) if name) or None
+
+        df = concat_compact([self.df, new_rows])
+        appended_in_order = df['date'].is_monotonic_increasing  # e.g. next week's file: no re-sort
+        combined = Dataset(combined_key(source_keys), df,
+                           report=report, source_name=source_name, source_keys=source_keys)
+        combined.report['rows'] = len(combined.df)
+        combined.report['memory_after'] = combined.nbytes
+        if appended_in_order:
+            hashes = np.concatenate([self.row_hashes(columns), other_hashes[is_new]])
+            combined._row_hashes = (tuple(columns), hashes)
+        if self._cube is not None:
+            combined._cube = RollupCube.from_cells(combine_rollups([self._cube.cells, build_rollup(new_rows)]))
+        return combined
+
+    @property
+    def index_nbytes(self):
+        """Memory held by the indexes built so far (filter index, rollup cube, location matches)."""
+        nbytes = 0
+        if self._filter_index is not None:
+            nbytes += self._filter_index.nbytes
+        if self._cube is not None:
+            nbytes += self._cube.nbytes
+        if self._locations is not None:
+            nbytes += int(self._locations.memory_usage(index=True, deep=True).sum())
+        return nbytes
+
+
+# --- Dataset Registry ---
+class DatasetRegistry:
+    """Process-wide table of loaded Datasets keyed by content hash, shared by every session.
+
+    A session holds a reference to the one dataset it is looking at; a dataset
+    stays loaded while at least one session references it and is dropped when
+    the last reference goes. Datasets are read-only, so all sessions share the
+    same frame and indexes.
+    """
+
+    def __init__(self):
+        self._datasets = {}   # key -> Dataset
+        self._sessions = {}   # session id -> dataset key
+        self._lock = threading.Lock()
+        self._inflight = {}   # key -> Lock held while that key is loading
+
+    def acquire(self, session_id, key, loader):
+        """Dataset for ``key`` (loaded with ``loader()`` if no session holds it yet), now referenced
+        by ``session_id`` in place of whatever that session referenced before."""
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is not None:
+                self._reference(session_id, key)
+                return dataset
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                with self._lock:
+                    dataset = self._datasets.get(key)
+                if dataset is None:
+                    dataset = loader()
+                with self._lock:
+                    dataset = self._datasets.setdefault(key, dataset)
+                    self._reference(session_id, key)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return dataset
+
+    def acquire_loaded(self, session_id, key):
+        """Like ``acquire``, but only for a dataset some session already loaded; None otherwise."""
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is not None:
+                self._reference(session_id, key)
+            return dataset
+
+    def session_dataset(self, session_id):
+        """Dataset currently referenced by ``session_id``, if any."""
+        with self._lock:
+            return self._datasets.get(self._sessions.get(session_id))
+
+    def release(self, session_id):
+        with self._lock:
+            self._unreference(session_id)
+
+    def prune(self, is_active):
+        """Release the references of sessions for which ``is_active(session_id)`` is false."""
+        with self._lock:
+            for session_id in [sid for sid in self._sessions if not is_active(sid)]:
+                self._unreference(session_id)
+
+    def _reference(self, session_id, key):
+        if self._sessions.get(session_id) != key:
+            self._unreference(session_id)
+            self._sessions[session_id] = key
+
+    def _unreference(self, session_id):
+        key = self._sessions.pop(session_id, None)
+        if key is not None and key not in self._sessions.values():
+            self._datasets.pop(key, None)
+
+    def entries(self):
+        """One row per loaded dataset: key, source name, rows, memory and referencing sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            datasets = list(self._datasets.values())
+        return [
+            {
+                'key': dataset.key,
+                'source_name': dataset.source_name,
+                'rows': len(dataset.df),
+                'data_bytes': dataset.nbytes,
+                'index_bytes': dataset.index_nbytes,
+                'sessions': sessions.count(dataset.key),
+            }
+            for dataset in datasets
+        ]
+
+    @property
+    def total_bytes(self):
+        return sum(entry['data_bytes'] + entry['index_bytes'] for entry in self.entries())
+
+    def __len__(self):
+        return len(self._datasets)
+
+    def __contains__(self, key):
+        return key in self._datasets
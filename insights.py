@@ -0,0 +1,138 @@
+# insights.py
+
+import string
+
+# --- Insight Templates ---
+# Every chart's insights are format strings rendered from DashboardSummary.insight_stats,
+# so adding a chart means registering templates here rather than scanning the data again.
+# Templates use str.format fields plus a ``!c`` conversion that capitalises a value.
+NO_DATA_INSIGHT = "Tidak ada data yang tersedia untuk menghasilkan insight. Coba sesuaikan filter Anda."
+
+INSIGHT_TEMPLATES = {}
+
+
+def insight(text, when=None):
+    """One insight line, rendered only if ``when(stats)`` is true (always, when omitted)."""
+    return {'text': text, 'when': when}
+
+
+def register_insights(chart_title, requires, fallback, templates):
+    """Register the insight lines of a chart.
+
+    ``requires(stats)`` decides whether there is enough data; if not, only
+    ``fallback`` is shown.
+    """
+    INSIGHT_TEMPLATES[chart_title] = {'requires': requires, 'fallback': fallback, 'templates': templates}
+
+
+class _InsightFormatter(string.Formatter):
+    def convert_field(self, value, conversion):
+        if conversion == 'c':
+            return str(value).capitalize()
+        return super().convert_field(value, conversion)
+
+
+_formatter = _InsightFormatter()
+
+
+def render_insights(chart_title, stats):
+    spec = INSIGHT_TEMPLATES[chart_title]
+    if not spec['requires'](stats):
+        return [spec['fallback']]
+    return [
+        _formatter.vformat(template['text'], (), stats)
+        for template in spec['templates']
+        if template['when'] is None or template['when'](stats)
+    ]
+
+
+def get_insights(chart_title, summary=None):
+    if summary is None or summary.empty:
+        return [NO_DATA_INSIGHT]
+    return render_insights(chart_title, summary.insight_stats)
+
+
+register_insights(
+    "Sentiment Breakdown",
+    requires=lambda s: s['sentiment_count'] > 0,
+    fallback="Data sentimen tidak cukup untuk analisis.",
+    templates=[
+        insight("Mayoritas sentimen adalah **{sentiment_top_name!c}** ({sentiment_top_share:.1%}), menunjukkan penerimaan yang baik terhadap kampanye/konten."),
+        insight("Sentimen negatif sebesar {sentiment_negative_pct:.1%} mengindikasikan area yang perlu diperbaiki. Perlu dianalisis akar masalah dari konten atau respons yang menimbulkan sentimen ini.",
+                when=lambda s: s['sentiment_negative_pct'] > 0),
+        insight("Tidak ada sentimen negatif terdeteksi, menunjukkan penerimaan yang sangat baik.",
+                when=lambda s: not s['sentiment_negative_pct'] > 0),
+        insight("Proporsi sentimen netral sebesar {sentiment_neutral_pct:.1%} dapat mengindikasikan peluang untuk lebih mengarahkan audiens ke sentimen positif melalui *call-to-action* yang lebih jelas atau konten yang lebih memprovokasi emosi."),
+    ],
+)
+
+register_insights(
+    "Engagement Trend over Time",
+    requires=lambda s: s['trend_weeks'] > 0,
+    fallback="Data tren *engagement* tidak cukup untuk analisis.",
+    templates=[
+        insight("Tren *engagement* menunjukkan puncaknya pada minggu yang dimulai **{trend_peak_week:%d %b %Y}**, menunjukkan waktu yang efektif untuk aktivitas kampanye tertentu."),
+        insight("Terjadi penurunan *engagement* pada minggu yang dimulai **{trend_low_week:%d %b %Y}**, perlu diinvestigasi faktor penyebab seperti perubahan strategi, konten, atau kejadian eksternal."),
+        insight("Total *engagement* dalam periode ini adalah **{trend_total:,.0f}**. Fluktuasi *engagement* menunjukkan pentingnya konsistensi dalam produksi konten dan interaksi yang relevan."),
+    ],
+)
+
+register_insights(
+    "Platform Engagements",
+    requires=lambda s: s['platform_count'] > 0,
+    fallback="Data *engagement* per *platform* tidak cukup untuk analisis.",
+    templates=[
+        insight("**{platform_first_name}** adalah *platform* dengan *engagement* tertinggi ({platform_first_value:,.0f}), menjadikannya saluran paling efektif untuk kampanye ini."),
+        insight("**{platform_second_name}** berada di posisi kedua ({platform_second_value:,.0f}), menunjukkan potensi yang baik namun mungkin masih bisa dioptimalkan.",
+                when=lambda s: s['platform_count'] > 1),
+        insight("**{platform_last_name}** memiliki *engagement* terendah ({platform_last_value:,.0f}), pertimbangkan untuk mengevaluasi kembali strategi atau alokasi sumber daya di *platform* ini.",
+                when=lambda s: s['platform_count'] > 2 and s['platform_last_distinct']),
+        insight("Diversifikasi *platform* penting untuk menjangkau audiens yang berbeda.",
+                when=lambda s: s['platform_count'] > 2 and not s['platform_last_distinct']),
+        insight("Diversifikasi *platform* penting untuk menjangkau audiens yang berbeda, namun alokasi sumber daya harus proporsional dengan performa *engagement*.",
+                when=lambda s: s['platform_count'] <= 2),
+    ],
+)
+
+register_insights(
+    "Media Type Mix",
+    requires=lambda s: s['media_type_count'] > 0,
+    fallback="Data tipe media tidak cukup untuk analisis.",
+    templates=[
+        insight("**{media_type_first_name!c}** adalah tipe media paling populer dengan proporsi **{media_type_first_value:.1%}**, menunjukkan preferensi audiens yang kuat terhadap format ini."),
+        insight("**{media_type_second_name!c}** berada di posisi kedua dengan **{media_type_second_value:.1%}**, yang juga merupakan format efektif untuk dipertimbangkan.",
+                when=lambda s: s['media_type_count'] > 1),
+        insight("Tipe media **{media_type_last_name!c}** memiliki proporsi terendah (**{media_type_last_value:.1%}**), mungkin memerlukan eksperimen lebih lanjut atau peninjauan ulang daya tariknya.",
+                when=lambda s: s['media_type_count'] > 2 and s['media_type_last_distinct']),
+        insight("Kombinasi berbagai tipe media dapat meningkatkan jangkauan dan daya tarik kampanye.",
+                when=lambda s: s['media_type_count'] > 2 and not s['media_type_last_distinct']),
+        insight("Kombinasi berbagai tipe media dapat meningkatkan jangkauan dan daya tarik kampanye, namun fokus harus pada format yang paling efektif.",
+                when=lambda s: s['media_type_count'] <= 2),
+    ],
+)
+
+register_insights(
+    "Top 5 Locations",
+    requires=lambda s: s['top_location_count'] > 0,
+    fallback="Data lokasi tidak cukup untuk analisis.",
+    templates=[
+        insight("**{top_location_first_name}** adalah lokasi dengan *engagement* tertinggi ({top_location_first_value:,.0f}), ini adalah pasar utama yang harus terus ditargetkan dengan kuat."),
+        insight("**{top_location_second_name}** juga menunjukkan *engagement* yang sangat tinggi ({top_location_second_value:,.0f}), menjadikannya lokasi kunci kedua untuk strategi pemasaran.",
+                when=lambda s: s['top_location_count'] > 1),
+        insight("Terdapat **{top_location_rest_count}** lokasi lain dalam top 5 yang menyumbang total {top_location_rest_value:,.0f} *engagement*, menunjukkan distribusi minat geografis yang beragam.",
+                when=lambda s: s['top_location_count'] > 2),
+        insight("Data lokasi membantu dalam lokalisasi konten dan strategi pemasaran, mengidentifikasi pasar utama dan potensi ekspansi.",
+                when=lambda s: s['top_location_count'] <= 2),
+    ],
+)
+
+register_insights(
+    "Geographical Engagement",
+    requires=lambda s: s['location_count'] > 0,
+    fallback="Data lokasi tidak cukup untuk analisis geografis.",
+    templates=[
+        insight("Visualisasi geografis menunjukkan distribusi *engagement* berdasarkan lokasi."),
+        insight("Lokasi dengan *engagement* tertinggi dapat menjadi target utama untuk kampanye lokal atau konten yang disesuaikan."),
+        insight("Area dengan *engagement* rendah mungkin memerlukan strategi *awareness* atau eksplorasi pasar baru."),
+    ],
+)
@@ -0,0 +1,128 @@
+# jobs.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_RUNNING_STATES = ('queued', 'running')
+# Finished jobs nobody picked up (e.g. the upload was removed meanwhile) are dropped after this long
+FINISHED_JOB_TTL_SECONDS = 600
+
+
+class IngestCancelled(Exception):
+    """Raised inside a job (from its progress callback) once the job has been cancelled."""
+
+
+class IngestJob:
+    """One background dataset load, polled by the page that started it.
+
+    ``status`` moves from ``queued`` to ``running`` and ends as ``done``
+    (``result`` holds the Dataset), ``failed`` (``error``) or ``cancelled``.
+    ``recorder`` is the job's own StageRecorder when it was started with
+    diagnostics on, since the rerun that started it has moved on by then.
+    """
+
+    def __init__(self, key, total_bytes=0, recorder=None):
+        self.key = key
+        self.total_bytes = total_bytes
+        self.recorder = recorder
+        self.status = 'queued'
+        self.rows_read = 0
+        self.bytes_read = 0
+        self.result = None
+        self.error = None
+        self.warnings = []
+        self.started_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status not in JOB_RUNNING_STATES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    @property
+    def fraction(self):
+        return min(self.bytes_read / max(self.total_bytes, 1), 1.0)
+
+    def report_progress(self, rows_read, bytes_read, total_bytes):
+        """Progress callback for the readers; raises IngestCancelled once ``cancel()`` was called."""
+        if self._cancel.is_set():
+            raise IngestCancelled(self.key)
+        self.rows_read, self.bytes_read, self.total_bytes = rows_read, bytes_read, total_bytes
+
+    def cancel(self):
+        """Ask the job to stop at its next progress report (or not to start at all)."""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.status = 'cancelled'
+            self.finished_at = time.time()
+
+
+class IngestJobs:
+    """Background dataset loads on a small thread pool, at most one job per dataset key.
+
+    Submitting a key that already has a job returns that job, so reruns and other
+    sessions uploading the same files share one load instead of restarting it.
+    Finished jobs are kept until discarded, so a later rerun picks up the result.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, load, total_bytes=0, recorder=None):
+        """Job for ``key``, running ``load(job)`` in the background unless one already exists."""
+        self.prune()
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = IngestJob(key, total_bytes=total_bytes, recorder=recorder)
+                self._jobs[key] = job
+                job.future = self._executor.submit(self._run, job, load)
+        return job
+
+    @staticmethod
+    def _run(job, load):
+        job.status = 'running'
+        try:
+            result = load(job)
+            if job.cancel_requested:
+                raise IngestCancelled(job.key)
+            job.result = result
+            job.status = 'done'
+        except IngestCancelled:
+            job.status = 'cancelled'
+        except Exception as e:
+            job.error = e
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def discard(self, key):
+        """Forget the job for ``key``, cancelling it if it is still running."""
+        with self._lock:
+            job = self._jobs.pop(key, None)
+        if job is not None and not job.finished:
+            job.cancel()
+        return job
+
+    def prune(self, max_age=FINISHED_JOB_TTL_SECONDS):
+        cutoff = time.time() - max_age
+        with self._lock:
+            for key, job in list(self._jobs.items()):
+                if job.finished and job.finished_at is not None and job.finished_at < cutoff:
+                    del self._jobs[key]
+
+    def entries(self):
+        with self._lock:
+            return list(self._jobs.values())
@@ -1,118 +1,36 @@
 # streamlit_app.py
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import io
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import datetime
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis import (
+    SUMMARY_FIGURES,
+    TREND_BUCKET_LABELS,
+    export_filtered,
+    full_date_range,
+    geo_figure,
+    load_files,
+    location_map_frame,
+    open_stored_dataset,
+    trend_figure,
+)
+from caching import SizedLRUCache
+from charts import payload_nbytes
+from data_store import DatasetStore
+from diagnostics import StageRecorder, configure_logging, no_stage
+from exporting import EXCEL_MAX_ROWS, EXPORT_FORMATS, EXPORT_MAX_BYTES, ExportCache, estimate_export_bytes
+from filters import filter_state_key
+from ingest import DatasetRegistry, combined_key, file_digest
+from insights import get_insights
+from jobs import IngestJobs
 
-# --- Helper Function to get Insights (Keep this as is) ---
-def get_insights(chart_title, df_filtered=None):
-    insights = []
-    if df_filtered is None or df_filtered.empty:
-        return ["Tidak ada data yang tersedia untuk menghasilkan insight. Coba sesuaikan filter Anda."]
-
-    if chart_title == "Sentiment Breakdown":
-        sentiment_counts = df_filtered['sentiment'].value_counts(normalize=True)
-        if not sentiment_counts.empty:
-            positive_pct = sentiment_counts.get('positive', 0) * 100
-            negative_pct = sentiment_counts.get('negative', 0) * 100
-            neutral_pct = sentiment_counts.get('neutral', 0) * 100
-
-            insights.append(f"Mayoritas sentimen adalah **{sentiment_counts.idxmax().capitalize()}** ({sentiment_counts.max():.1%}), menunjukkan penerimaan yang baik terhadap kampanye/konten.")
-            if negative_pct > 0:
-                insights.append(f"Sentimen negatif sebesar {negative_pct:.1%} mengindikasikan area yang perlu diperbaiki. Perlu dianalisis akar masalah dari konten atau respons yang menimbulkan sentimen ini.")
-            else:
-                insights.append("Tidak ada sentimen negatif terdeteksi, menunjukkan penerimaan yang sangat baik.")
-            insights.append(f"Proporsi sentimen netral sebesar {neutral_pct:.1%} dapat mengindikasikan peluang untuk lebih mengarahkan audiens ke sentimen positif melalui *call-to-action* yang lebih jelas atau konten yang lebih memprovokasi emosi.")
-        else:
-            insights.append("Data sentimen tidak cukup untuk analisis.")
-
-    elif chart_title == "Engagement Trend over Time":
-        df_filtered_weekly = df_filtered.groupby(df_filtered['date'].dt.to_period('W'))['engagements'].sum().reset_index()
-        df_filtered_weekly['date'] = df_filtered_weekly['date'].dt.start_time
-
-        if not df_filtered_weekly.empty:
-            if not df_filtered_weekly['engagements'].empty:
-                max_engagement_date = df_filtered_weekly.loc[df_filtered_weekly['engagements'].idxmax(), 'date']
-                min_engagement_date = df_filtered_weekly.loc[df_filtered_weekly['engagements'].idxmin(), 'date']
-                total_engagements = df_filtered_weekly['engagements'].sum()
-
-                insights.append(f"Tren *engagement* menunjukkan puncaknya pada minggu yang dimulai **{max_engagement_date.strftime('%d %b %Y')}**, menunjukkan waktu yang efektif untuk aktivitas kampanye tertentu.")
-                insights.append(f"Terjadi penurunan *engagement* pada minggu yang dimulai **{min_engagement_date.strftime('%d %b %Y')}**, perlu diinvestigasi faktor penyebab seperti perubahan strategi, konten, atau kejadian eksternal.")
-                insights.append(f"Total *engagement* dalam periode ini adalah **{total_engagements:,.0f}**. Fluktuasi *engagement* menunjukkan pentingnya konsistensi dalam produksi konten dan interaksi yang relevan.")
-            else:
-                insights.append("Data *engagement* tidak cukup untuk analisis tren.")
-        else:
-            insights.append("Data tren *engagement* tidak cukup untuk analisis.")
-
-    elif chart_title == "Platform Engagements":
-        platform_engagements = df_filtered.groupby('platform')['engagements'].sum().sort_values(ascending=True).reset_index()
-        if not platform_engagements.empty:
-            top_platform = platform_engagements.iloc[0]
-            insights.append(f"**{top_platform['platform']}** adalah *platform* dengan *engagement* tertinggi ({top_platform['engagements']:,.0f}), menjadikannya saluran paling efektif untuk kampanye ini.")
-            if len(platform_engagements) > 1:
-                second_platform = platform_engagements.iloc[1]
-                insights.append(f"**{second_platform['platform']}** berada di posisi kedua ({second_platform['engagements']:,.0f}), menunjukkan potensi yang baik namun mungkin masih bisa dioptimalkan.")
-            if len(platform_engagements) > 2:
-                 least_platform = platform_engagements.iloc[-1]
-                 if least_platform['platform'] not in [top_platform['platform'], second_platform['platform']]:
-                     insights.append(f"**{least_platform['platform']}** memiliki *engagement* terendah ({least_platform['engagements']:,.0f}), pertimbangkan untuk mengevaluasi kembali strategi atau alokasi sumber daya di *platform* ini.")
-                 else:
-                     insights.append("Diversifikasi *platform* penting untuk menjangkau audiens yang berbeda.")
-            else:
-                insights.append("Diversifikasi *platform* penting untuk menjangkau audiens yang berbeda, namun alokasi sumber daya harus proporsional dengan performa *engagement*.")
-        else:
-            insights.append("Data *engagement* per *platform* tidak cukup untuk analisis.")
-
-    elif chart_title == "Media Type Mix":
-        media_type_counts = df_filtered['media_type'].value_counts(normalize=True).reset_index()
-        media_type_counts.columns = ['media_type', 'percentage']
-        if not media_type_counts.empty:
-            most_popular = media_type_counts.iloc[0]
-            insights.append(f"**{most_popular['media_type'].capitalize()}** adalah tipe media paling populer dengan proporsi **{most_popular['percentage']:.1%}**, menunjukkan preferensi audiens yang kuat terhadap format ini.")
-            if len(media_type_counts) > 1:
-                second_popular = media_type_counts.iloc[1]
-                insights.append(f"**{second_popular['media_type'].capitalize()}** berada di posisi kedua dengan **{second_popular['percentage']:.1%}**, yang juga merupakan format efektif untuk dipertimbangkan.")
-            if len(media_type_counts) > 2:
-                least_popular = media_type_counts.iloc[-1]
-                if least_popular['media_type'] not in [most_popular['media_type'], second_popular['media_type']]:
-                    insights.append(f"Tipe media **{least_popular['media_type'].capitalize()}** memiliki proporsi terendah (**{least_popular['percentage']:.1%}**), mungkin memerlukan eksperimen lebih lanjut atau peninjauan ulang daya tariknya.")
-                else:
-                    insights.append("Kombinasi berbagai tipe media dapat meningkatkan jangkauan dan daya tarik kampanye.")
-            else:
-                 insights.append("Kombinasi berbagai tipe media dapat meningkatkan jangkauan dan daya tarik kampanye, namun fokus harus pada format yang paling efektif.")
-        else:
-            insights.append("Data tipe media tidak cukup untuk analisis.")
-
-    elif chart_title == "Top 5 Locations":
-        top_locations = df_filtered.groupby('location')['engagements'].sum().nlargest(5).sort_values(ascending=True).reset_index()
-        if not top_locations.empty:
-            top1_loc = top_locations.iloc[0]
-            insights.append(f"**{top1_loc['location']}** adalah lokasi dengan *engagement* tertinggi ({top1_loc['engagements']:,.0f}), ini adalah pasar utama yang harus terus ditargetkan dengan kuat.")
-            if len(top_locations) > 1:
-                top2_loc = top_locations.iloc[1]
-                insights.append(f"**{top2_loc['location']}** juga menunjukkan *engagement* yang sangat tinggi ({top2_loc['engagements']:,.0f}), menjadikannya lokasi kunci kedua untuk strategi pemasaran.")
-            if len(top_locations) > 2:
-                remaining_eng = top_locations.iloc[2:]['engagements'].sum()
-                insights.append(f"Terdapat **{len(top_locations) - 2}** lokasi lain dalam top 5 yang menyumbang total {remaining_eng:,.0f} *engagement*, menunjukkan distribusi minat geografis yang beragam.")
-            else:
-                insights.append("Data lokasi membantu dalam lokalisasi konten dan strategi pemasaran, mengidentifikasi pasar utama dan potensi ekspansi.")
-        else:
-            insights.append("Data lokasi tidak cukup untuk analisis.")
-
-    elif chart_title == "Geographical Engagement":
-        if not df_filtered.empty and 'location' in df_filtered.columns:
-            location_engagements = df_filtered.groupby('location')['engagements'].sum().reset_index()
-            location_engagements.columns = ['location', 'total_engagements']
-            insights.append("Visualisasi geografis menunjukkan distribusi *engagement* berdasarkan lokasi.")
-            insights.append("Lokasi dengan *engagement* tertinggi dapat menjadi target utama untuk kampanye lokal atau konten yang disesuaikan.")
-            insights.append("Area dengan *engagement* rendah mungkin memerlukan strategi *awareness* atau eksplorasi pasar baru.")
-        else:
-            insights.append("Data lokasi tidak cukup untuk analisis geografis.")
-
-    return insights
 
 # --- Streamlit App Configuration ---
 st.set_page_config(
@@ -441,11 +359,388 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# --- Shared Dataset Registry ---
+# One registry per server process: the same file (by content hash) is parsed and cleaned
+# only once, and every session looking at it shares one read-only Dataset. A dataset is
+# dropped when the last session referencing it moves on or ends.
+ADMIN_VIEW_ENABLED = os.environ.get('DASHBOARD_ADMIN_VIEW') == '1'
+# Single-team deployments set this to let every session reopen any stored dataset (including
+# those pre-saved by ``batch.py --warm-store``) without uploading it again
+SHARED_STORE_ENABLED = os.environ.get('DASHBOARD_SHARED_STORE') == '1'
+
+
+@st.cache_resource
+def get_dataset_registry():
+    return DatasetRegistry()
+
+
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def prune_ended_sessions():
+    if runtime.exists():
+        get_dataset_registry().prune(runtime.get_instance().is_active_session)
+
+
+def uploaded_file_keys(uploaded_files):
+    """Content hash of each uploaded file. Hashing a multi-GB upload takes seconds, so each upload
+    (by its ``file_id``) is hashed once per session and the digest reused on every rerun."""
+    digests = st.session_state.get('upload_digests', {})
+    digests = {
+        uploaded_file.file_id: digests.get(uploaded_file.file_id) or file_digest(uploaded_file.getvalue())
+        for uploaded_file in uploaded_files
+    }
+    st.session_state.upload_digests = digests  # files no longer uploaded are forgotten
+    keys = [digests[uploaded_file.file_id] for uploaded_file in uploaded_files]
+    # Unless the store is shared, the stored dataset picker only offers files this session uploaded
+    st.session_state.uploaded_dataset_keys = st.session_state.get('uploaded_dataset_keys', set()) | set(keys)
+    return keys
+
+
+def acquire_dataset(dataset_key, loader):
+    prune_ended_sessions()
+    return get_dataset_registry().acquire(current_session_id(), dataset_key, loader)
+
+
+# --- Diagnostics ---
+# Opt-in (sidebar toggle, or ?diagnostics=1 in the URL): every full run records the wall time and
+# peak memory growth of its stages, shown in a panel at the bottom of Home and logged as JSON lines.
+def current_stage():
+    """``StageRecorder.stage`` of this run, or a no-op when diagnostics are off."""
+    recorder = st.session_state.get('stage_recorder')
+    return no_stage if recorder is None else recorder.stage
+
+
+def stage(name, **context):
+    return current_stage()(name, **context)
+
+
+def show_diagnostics(recorder):
+    # Stages still open (an export running in its download thread) are left out
+    records = [record for record in recorder.records if 'seconds' in record]
+    run_fields = {'stage', 'seconds', 'peak_memory_delta', 'depth', *recorder.context}
+    with st.expander(f"Diagnostik: {len(records)} tahap tercatat", expanded=False):
+        if 'dataset' in recorder.context:
+            st.caption(f"Dataset: {recorder.context['dataset']} ({recorder.context['dataset_rows']:,} baris)")
+        st.caption("Waktu dan kenaikan memori puncak per tahap dari proses terakhir; tahap di dalam tahap lain ditandai ↳. "
+                   "Memori diukur untuk seluruh proses server, sehingga angkanya bersifat indikatif.")
+        st.dataframe(
+            [
+                {
+                    'Tahap': '↳ ' * record['depth'] + record['stage'],
+                    'Detail': ', '.join(f"{name}={value}" for name, value in record.items() if name not in run_fields),
+                    'Waktu (ms)': round(record['seconds'] * 1000, 1),
+                    'Memori Puncak': '-' if record['peak_memory_delta'] is None else format_bytes(record['peak_memory_delta']),
+                }
+                for record in records
+            ],
+            width='stretch'
+        )
+
+
+@st.cache_resource
+def get_parse_pool():
+    # Spawned (not forked) workers: forking the multi-threaded server process is unsafe
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn'))
+
+
+@st.cache_resource
+def get_dataset_store():
+    store = DatasetStore()
+    store.prune()  # datasets that aged out while the server was down
+    return store
+
+
+def format_bytes(num_bytes):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if num_bytes < 1024 or unit == 'GB':
+            return f"{num_bytes:,.1f} {unit}"
+        num_bytes /= 1024
+
+
+# --- Background Ingest ---
+# Uploaded files are parsed and cleaned by a background job keyed by the combined file hash, so the
+# page stays responsive, shows progress and can cancel. Reruns (and other sessions uploading the
+# same files) share the running job instead of restarting it, and pick up its dataset once done.
+INGEST_POLL_SECONDS = 1.0
+
+
+@st.cache_resource
+def get_ingest_jobs():
+    return IngestJobs(max_workers=2)
+
+
+def start_ingest_job(uploaded_files, file_keys, dataset_key):
+    # Start from the dataset this session already has open when all of its files are still uploaded,
+    # so adding one more file only parses that file and extends the existing rows and rollup cube.
+    # Each file is parsed once and kept in the dataset store, so re-adding it later is a memory-map.
+    files = [(uploaded_file.name, file_key, uploaded_file.getvalue()) for uploaded_file, file_key in zip(uploaded_files, file_keys)]
+    base_dataset = get_dataset_registry().session_dataset(current_session_id())
+    store, executor = get_dataset_store(), get_parse_pool()
+    # The job outlives this run's recorder, so it records into its own; open_dataset merges the
+    # records into the diagnostics of the run that picks up the finished dataset.
+    recorder = st.session_state.stage_recorder
+    job_recorder = None if recorder is None else StageRecorder(**recorder.context)
+
+    def load(job):
+        return load_files(files, store=store, base_dataset=base_dataset, executor=executor,
+                          progress=job.report_progress, stage=no_stage if job.recorder is None else job.recorder.stage,
+                          on_store_error=lambda name, e: job.warnings.append(f"{name}: {e}"))
+
+    return get_ingest_jobs().submit(dataset_key, load, total_bytes=sum(len(file_bytes) for _, _, file_bytes in files),
+                                    recorder=job_recorder)
+
+
+def open_dataset(dataset_key, uploaded_files=None, file_keys=None):
+    """Dataset for ``dataset_key``, or None while its ingest job has not produced it yet.
+
+    Without ``uploaded_files`` (the session's open dataset, after the uploader was emptied by
+    leaving the page) the dataset is taken from the registry, a running job or the dataset store.
+    """
+    prune_ended_sessions()
+    registry = get_dataset_registry()
+    dataset = registry.acquire_loaded(current_session_id(), dataset_key)
+    if dataset is not None:
+        return dataset
+
+    jobs = get_ingest_jobs()
+    job = jobs.get(dataset_key)
+    if job is None:
+        if uploaded_files is None:
+            return registry.acquire(current_session_id(), dataset_key,
+                                    lambda: open_stored_dataset(get_dataset_store(), dataset_key))
+        job = start_ingest_job(uploaded_files, file_keys, dataset_key)
+    if job.status == 'done':
+        jobs.discard(dataset_key)
+        if job.recorder is not None and st.session_state.stage_recorder is not None:
+            st.session_state.stage_recorder.extend(job.recorder.records)
+        for message in job.warnings:
+            st.warning(f"Dataset tidak dapat disimpan untuk sesi berikutnya: {message}")
+        return registry.acquire(current_session_id(), dataset_key, lambda: job.result)
+    if job.status == 'failed':
+        # Dropped so that the next rerun tries again
+        jobs.discard(dataset_key)
+        raise job.error
+    return None
+
+
+def dataset_available(dataset_key):
+    """Whether ``open_dataset`` can still produce ``dataset_key`` without its files."""
+    return (dataset_key in get_dataset_registry() or get_ingest_jobs().get(dataset_key) is not None
+            or dataset_key in get_dataset_store())
+
+
+@st.fragment(run_every=INGEST_POLL_SECONDS)
+def ingest_job_panel(dataset_key):
+    job = get_ingest_jobs().get(dataset_key)
+    if job is None or job.status in ('done', 'failed'):
+        # A full rerun shows the finished dataset (or the error)
+        st.rerun()
+    if job.status == 'cancelled':
+        st.warning("Pemrosesan file dibatalkan.")
+        if st.button("Proses Ulang"):
+            get_ingest_jobs().discard(dataset_key)
+            st.rerun()
+        return
+
+    st.progress(
+        job.fraction,
+        text=f"Memproses file di latar belakang... {job.rows_read:,} baris ({format_bytes(job.bytes_read)} / {format_bytes(job.total_bytes)})"
+    )
+    st.caption("Halaman tetap dapat digunakan selama file diproses; dashboard akan muncul otomatis setelah selesai.")
+    if st.button("Batalkan", disabled=job.cancel_requested):
+        job.cancel()
+        st.rerun(scope='fragment')
+
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache(max_entries=16)
+
+
+def export_too_large(size, estimated=False):
+    return ValueError(f"File ekspor ({'sekitar ' if estimated else ''}{format_bytes(size)}) melebihi batas unduhan "
+                      f"{format_bytes(EXPORT_MAX_BYTES)}. Persempit filter atau pilih CSV (gzip) atau Parquet.")
+
+
+def build_export(dataset, filter_selections, filter_date_range, export_format, num_rows, stage=no_stage):
+    # Filter rows through the precomputed index (a binary-searched date slice plus per-value
+    # bitmaps) and stream them to disk chunk by chunk without materialising the filtered frame.
+    # Runs in a download thread, so the diagnostics stage is passed in rather than looked up.
+    # Streamlit serves downloads from memory, so files over EXPORT_MAX_BYTES are refused: before
+    # writing, from an estimate for the ``num_rows`` selected rows, and again from the actual size.
+    export_key = (dataset.key, filter_state_key(filter_selections, filter_date_range), export_format)
+    export_cache = get_export_cache()
+    with stage('export', format=export_format) as stage_context:
+        if export_cache.get(export_key) is None:
+            estimate = estimate_export_bytes(dataset.df, num_rows, export_format)
+            if estimate > EXPORT_MAX_BYTES:
+                raise export_too_large(estimate, estimated=True)
+
+        def write(path):
+            stage_context['rows'] = export_filtered(dataset, filter_selections, filter_date_range, path, export_format)
+
+        path = export_cache.get_or_create(export_key, EXPORT_FORMATS[export_format]['suffix'], write)
+        stage_context['cache_hit'] = 'rows' not in stage_context
+    size = os.path.getsize(path)
+    if size > EXPORT_MAX_BYTES:
+        raise export_too_large(size)
+    with open(path, 'rb') as export_file:
+        return export_file.read()
+
+
+def render_chart(fig, chart_name):
+    # Charts carry the small dashboard template themselves, so Streamlit's theme is not applied.
+    # With diagnostics on, the JSON size of each figure is recorded per session; measuring it
+    # serialises the figure a second time, so it is skipped otherwise and None is returned.
+    st.plotly_chart(fig, width='stretch', theme=None)
+    if st.session_state.stage_recorder is None:
+        return None
+    st.session_state.chart_payload_bytes[chart_name] = payload_nbytes(fig)
+    return st.session_state.chart_payload_bytes[chart_name]
+
+
+# --- Dashboard Panels ---
+# Panels with their own widgets (trend resolution, export format) are fragments: changing the
+# widget reruns only that panel, reusing the DashboardSummary it was given by the last full run.
+# Panels without widgets only ever change with the sidebar filters, which rerun the whole page,
+# so they are plain functions.
+def show_insights(chart_title, summary):
+    st.markdown("#### Insight:")
+    with stage('insights', chart=chart_title):
+        insights = get_insights(chart_title, summary)
+    for insight in insights:
+        st.markdown(f"- {insight}")
+
+
+def kpi_panel(summary):
+    with st.container():
+        st.subheader("Key Performance Indicators (KPIs)")
+        kpi1, kpi2, kpi3 = st.columns(3)
+
+        with kpi1:
+            st.metric(label="TOTAL ENGAGEMENTS", value=f"{summary.total_engagements:,.0f}")
+
+        with kpi2:
+            st.metric(label="PLATFORM AKTIF", value=f"{summary.num_platforms}")
+
+        with kpi3:
+            st.metric(label="JUMLAH DATA POINTS", value=f"{summary.num_rows:,.0f}")
+
+
+def chart_panel(heading, chart_title, summary):
+    with st.container():
+        st.write(f"### {heading}")
+        with stage('chart', chart=chart_title) as stage_context:
+            stage_context['payload_bytes'] = render_chart(SUMMARY_FIGURES[chart_title](summary), chart_title)
+        show_insights(chart_title, summary)
+
+
+@st.fragment
+def trend_panel(summary, start_date, end_date):
+    with st.container():
+        st.write("### Tren Engagement dari Waktu ke Waktu")
+        trend_resolution = st.radio(
+            "Resolusi",
+            [None] + list(TREND_BUCKET_LABELS),
+            format_func=lambda bucket: "Otomatis" if bucket is None else TREND_BUCKET_LABELS[bucket][0],
+            horizontal=True,
+            key="trend_resolution"
+        )
+        with stage('chart', chart="Engagement Trend over Time") as stage_context:
+            # Bucket size follows the selected date range unless chosen here
+            fig_engagement_trend, engagement_over_time, trend_bucket = trend_figure(
+                summary, start_date, end_date, bucket=trend_resolution
+            )
+            stage_context.update(bucket=trend_bucket, points=len(engagement_over_time),
+                                 payload_bytes=render_chart(fig_engagement_trend, "Engagement Trend over Time"))
+        show_insights("Engagement Trend over Time", summary)
+
+
+def geo_panel(summary, dataset):
+    with st.container():
+        st.write("### Peta Engagement Geografis (Eksperimental)")
+        st.info("Lokasi dicocokkan dengan gazetteer bawaan (negara, provinsi dan kota di Indonesia, beserta nama alternatifnya); lokasi lain dicocokkan sebagai nama negara.")
+        try:
+            with stage('chart', chart="Geographical Engagement") as stage_context:
+                location_engagements_map, unresolved_locations = location_map_frame(summary, dataset)
+                if not unresolved_locations.empty:
+                    st.caption(f"Lokasi di luar gazetteer, ditampilkan hanya jika berupa nama negara: {', '.join(map(str, unresolved_locations))}")
+                stage_context['payload_bytes'] = render_chart(geo_figure(location_engagements_map), "Geographical Engagement")
+            show_insights("Geographical Engagement", summary)
+
+        except Exception as e:
+            st.warning(f"Tidak dapat membuat peta geografis: {e}. Pastikan data 'Location' Anda valid (nama kota/provinsi/negara) dan konsisten.")
+
+
+@st.fragment
+def export_panel(dataset, summary, filter_selections, filter_date_range):
+    # Called inside `with st.sidebar:`; changing the format reruns only this panel
+    st.header("Ekspor Data")
+    export_format = st.selectbox(
+        "Format Ekspor",
+        list(EXPORT_FORMATS),
+        format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+        key="export_format"
+    )
+    if export_format == 'xlsx' and summary.num_rows > EXCEL_MAX_ROWS - 1:
+        st.warning(f"Data yang difilter ({summary.num_rows:,} baris) melebihi batas {EXCEL_MAX_ROWS - 1:,} baris per sheet Excel dan akan dibagi ke beberapa sheet. Gunakan CSV atau Parquet untuk data sebesar ini.")
+
+    # The file is only generated when the button is clicked (in a background thread),
+    # and cached per dataset, filter state and format
+    st.download_button(
+        label=f"Unduh Data yang Difilter ({EXPORT_FORMATS[export_format]['label']})",
+        data=functools.partial(build_export, dataset, filter_selections, filter_date_range, export_format,
+                               summary.num_rows, stage=current_stage()),
+        file_name=f"filtered_media_data{EXPORT_FORMATS[export_format]['suffix']}",
+        mime=EXPORT_FORMATS[export_format]['mime'],
+        on_click='ignore'
+    )
+    st.info("Data yang diunduh akan sesuai dengan filter yang Anda pilih di dashboard.")
+    st.caption(f"Ukuran file unduhan dibatasi {format_bytes(EXPORT_MAX_BYTES)}.")
+
+
 # --- Page State Management for Sidebar Navigation ---
 # Using session state to track the active page
 if 'page' not in st.session_state:
     st.session_state.page = 'Home'
 
+# Per-session cache of filter results (DashboardSummary) keyed by dataset and normalised filter state
+if 'filter_result_cache' not in st.session_state:
+    st.session_state.filter_result_cache = SizedLRUCache(max_entries=32, max_bytes=64 * 1024 ** 2)
+
+# Figure JSON size per chart from the latest render with diagnostics on, in bytes
+if 'chart_payload_bytes' not in st.session_state:
+    st.session_state.chart_payload_bytes = {}
+
+# --- Session Persistence Across Pages ---
+# The dataset open in this session and the filter widgets outlive page navigation: widgets that are
+# not rendered on a run (another page is shown) would otherwise drop their state, and the emptied
+# uploader would close the dataset. Re-assigning the widget values on every run keeps them.
+FILTER_WIDGET_KEYS = ['filter_platforms', 'filter_sentiments', 'filter_media_types', 'filter_locations', 'filter_date_range']
+PERSISTENT_WIDGET_KEYS = FILTER_WIDGET_KEYS + ['trend_resolution', 'export_format']
+
+if 'active_dataset_key' not in st.session_state:
+    st.session_state.active_dataset_key = None
+
+for widget_key in PERSISTENT_WIDGET_KEYS:
+    if widget_key in st.session_state:
+        st.session_state[widget_key] = st.session_state[widget_key]
+
+
+def widget_default(widget_key, **default):
+    """Default keyword for a persistent widget, left out once its value lives in session state
+    (Streamlit warns when a widget gets both)."""
+    return {} if widget_key in st.session_state else default
+
+
+def close_active_dataset():
+    # Called when the uploader or the stored dataset picker changes; the new choice opens its own dataset
+    st.session_state.active_dataset_key = None
+
+
 def set_page(page_name):
     st.session_state.page = page_name
 
@@ -508,14 +803,17 @@ with st.sidebar:
     # The current specific selector for radio button options is often div.st-af.
     
     # Simulating the radio buttons as capsules with icons
+    navigation_pages = [
+        "🏠 Home",
+        "ℹ️ About",
+        "🗄️ Project",
+        "✉️ Contact"
+    ]
+    if ADMIN_VIEW_ENABLED:
+        navigation_pages.append("🛠️ Admin")
     selected_page = st.radio(
         "",
-        [
-            "🏠 Home",
-            "ℹ️ About",
-            "🗄️ Project",
-            "✉️ Contact"
-        ],
+        navigation_pages,
         index=0, # Default selected index
         key="main_navigation_radio",
         on_change=lambda: set_page(st.session_state.main_navigation_radio.split(' ')[1]) # Extract actual page name
@@ -523,10 +821,23 @@ with st.sidebar:
     
     st.session_state.page = selected_page.split(' ')[1] # Update page state based on selection
 
+    diagnostics_enabled = st.toggle(
+        "Mode Diagnostik",
+        value=st.query_params.get('diagnostics') == '1',
+        help="Catat waktu dan memori tiap tahap (unggah, filter, grafik, insight, ekspor) dan tampilkan di bagian bawah halaman."
+    )
+
     st.markdown("---")
     st.markdown("<h4 style='text-align: center; color: #A0A0A0;'>Presented by</h4>", unsafe_allow_html=True)
     st.markdown("<h3 style='text-align: center; color: #FFFFFF;'>Shannon Sifra</h3>", unsafe_allow_html=True)
 
+# A fresh recorder per full run; fragment reruns keep adding to it (their stages are logged either way)
+if diagnostics_enabled:
+    configure_logging()
+    st.session_state.stage_recorder = StageRecorder(session=current_session_id())
+else:
+    st.session_state.stage_recorder = None
+
 # --- Main Content Area ---
 
 if st.session_state.page == 'Home':
@@ -583,19 +894,75 @@ if st.session_state.page == 'Home':
     # Bagian Unggah & Pembersihan Data
     with st.container():
         st.header("Unggah Data Anda")
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "Seret & Lepas atau Klik untuk Unggah file CSV Anda",
             type=["csv"],
-            help="Pastikan file CSV memiliki kolom: Date, Platform, Sentiment, Location, Engagements, Media Type."
+            accept_multiple_files=True,
+            help="Pastikan file CSV memiliki kolom: Date, Platform, Sentiment, Location, Engagements, Media Type. "
+                 "Beberapa file (misalnya satu per minggu) digabung menjadi satu dataset; baris yang sama persis hanya dihitung sekali.",
+            on_change=close_active_dataset
         )
 
+        # Stored datasets can be reopened without uploading again. The store holds every session's
+        # uploads, so unless it is shared (DASHBOARD_SHARED_STORE=1) only this session's are listed
+        stored_dataset_key = None
+        stored_keys = None if SHARED_STORE_ENABLED else st.session_state.get('uploaded_dataset_keys', set())
+        stored_datasets = get_dataset_store().list_datasets(keys=stored_keys)
+        if not uploaded_files and stored_datasets:
+            stored_labels = {meta['key']: f"{meta.get('source_name') or meta['key'][:12]} ({meta['rows']:,} baris, {meta['saved_at']})" for meta in stored_datasets}
+            stored_dataset_key = st.selectbox(
+                "Atau buka dataset tersimpan" if SHARED_STORE_ENABLED else "Atau buka dataset yang pernah Anda unggah di sesi ini",
+                [None] + list(stored_labels),
+                format_func=lambda key: "-" if key is None else stored_labels[key],
+                on_change=close_active_dataset
+            )
+
     df = None # Inisialisasi DataFrame menjadi None
 
-    if uploaded_file is not None:
+    # Coming back from another page the uploader is empty, but the dataset opened before stays open
+    active_dataset_key = st.session_state.active_dataset_key
+    if active_dataset_key is not None and not dataset_available(active_dataset_key):
+        st.session_state.active_dataset_key = active_dataset_key = None
+
+    if uploaded_files or stored_dataset_key is not None or active_dataset_key is not None:
         with st.spinner('Memproses file dan menyiapkan dashboard... Ini mungkin memerlukan beberapa detik.'):
             try:
-                df = pd.read_csv(uploaded_file)
-                st.success("File berhasil diunggah!")
+                if uploaded_files:
+                    file_keys = uploaded_file_keys(uploaded_files)
+                    dataset_key = combined_key(file_keys)
+                    st.session_state.active_dataset_key = dataset_key
+                    with stage('ingest', files=len(uploaded_files), bytes=sum(uploaded_file.size for uploaded_file in uploaded_files)):
+                        dataset = open_dataset(dataset_key, uploaded_files, file_keys)
+                    if dataset is None:
+                        ingest_job_panel(dataset_key)
+                        st.stop()
+                    st.success("File berhasil diunggah!" if len(uploaded_files) == 1 else f"{len(uploaded_files)} file berhasil diunggah dan digabung!")
+                elif stored_dataset_key is not None:
+                    dataset_key = stored_dataset_key
+                    st.session_state.active_dataset_key = dataset_key
+                    with stage('ingest', stored=True):
+                        dataset = acquire_dataset(dataset_key, lambda: open_stored_dataset(get_dataset_store(), dataset_key))
+                    st.success("Dataset tersimpan berhasil dibuka!")
+                else:
+                    dataset_key = active_dataset_key
+                    with stage('ingest', restored=True):
+                        dataset = open_dataset(dataset_key)
+                    if dataset is None:
+                        ingest_job_panel(dataset_key)
+                        st.stop()
+                    st.info(f"Menampilkan dataset yang sedang dibuka ({dataset.source_name or dataset.key[:12]}). Unggah file atau pilih dataset tersimpan untuk menggantinya.")
+                    if st.button("Tutup Dataset"):
+                        close_active_dataset()
+                        st.rerun()
+                df = dataset.df
+
+                # Filters chosen for another dataset may not apply to this one
+                if st.session_state.get('filter_dataset_key') != dataset.key:
+                    for widget_key in FILTER_WIDGET_KEYS:
+                        st.session_state.pop(widget_key, None)
+                    st.session_state.filter_dataset_key = dataset.key
+                if st.session_state.stage_recorder is not None:
+                    st.session_state.stage_recorder.context.update(dataset=dataset.source_name or dataset.key[:12], dataset_rows=len(df))
 
                 with st.container():
                     st.header("Pembersihan Data Otomatis")
@@ -605,14 +972,24 @@ if st.session_state.page == 'Home':
                         -   Mengubah kolom **'Date'** ke format tanggal yang standar.
                         -   Mengisi nilai **'Engagements'** yang kosong (missing) dengan 0.
                         -   Menormalisasi nama kolom (mengubah ke huruf kecil dan mengganti spasi dengan garis bawah) agar mudah diproses.
+                        -   Menyimpan kolom kategori (Platform, Sentiment, Media Type, Location) dalam format ringkas untuk menghemat memori.
                         """
                     )
 
-                    # --- Data Cleaning ---
-                    df.columns = df.columns.str.lower().str.replace(' ', '_')
-                    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-                    df['engagements'] = pd.to_numeric(df['engagements'], errors='coerce').fillna(0).astype(int)
-                    df.dropna(subset=['date'], inplace=True)
+                    # Cleaning itself happens once per file inside read_media_csv (see ingest.py)
+                    if dataset.report.get('memory_before'):
+                        memory_before = dataset.report['memory_before']
+                        memory_after = dataset.report['memory_after']
+                        st.caption(f"Penggunaan memori data: {format_bytes(memory_before)} → {format_bytes(memory_after)} ({memory_before / max(memory_after, 1):.1f}× lebih kecil)")
+                    if dataset.report.get('date_format'):
+                        st.caption(f"Format tanggal terdeteksi: `{dataset.report['date_format']}` ({dataset.report.get('dates_fallback', 0):,} baris diurai dengan format lain)")
+                    if dataset.report.get('rows_dropped'):
+                        st.warning(
+                            f"{dataset.report['rows_dropped']:,} dari {dataset.report['rows_read']:,} baris dibuang karena kolom 'Date' tidak valid "
+                            f"({dataset.report.get('dates_invalid', 0):,} tidak dapat diurai, {dataset.report.get('dates_missing', 0):,} kosong)."
+                        )
+                    if dataset.report.get('rows_duplicate'):
+                        st.caption(f"{dataset.report['rows_duplicate']:,} baris yang sudah ada di file sebelumnya dilewati saat menggabungkan file.")
 
                     st.success("Pembersihan data selesai dan siap dianalisis!")
                     st.subheader("Pratinjau Data Setelah Dibersihkan:")
@@ -627,64 +1004,60 @@ if st.session_state.page == 'Home':
                 st.sidebar.header("Filter Data")
                 with st.sidebar.expander("Sesuaikan Filter Analisis Anda", expanded=True):
                     unique_platforms = ['Semua'] + df['platform'].unique().tolist()
-                    selected_platforms = st.multiselect("Pilih Platform(s)", unique_platforms, default=['Semua'])
+                    selected_platforms = st.multiselect("Pilih Platform(s)", unique_platforms, key='filter_platforms',
+                                                        **widget_default('filter_platforms', default=['Semua']))
 
                     unique_sentiments = ['Semua'] + df['sentiment'].unique().tolist()
-                    selected_sentiments = st.multiselect("Pilih Sentimen(s)", unique_sentiments, default=['Semua'])
+                    selected_sentiments = st.multiselect("Pilih Sentimen(s)", unique_sentiments, key='filter_sentiments',
+                                                         **widget_default('filter_sentiments', default=['Semua']))
 
                     unique_media_types = ['Semua'] + df['media_type'].unique().tolist()
-                    selected_media_types = st.multiselect("Pilih Tipe Media(s)", unique_media_types, default=['Semua'])
+                    selected_media_types = st.multiselect("Pilih Tipe Media(s)", unique_media_types, key='filter_media_types',
+                                                          **widget_default('filter_media_types', default=['Semua']))
 
                     unique_locations = ['Semua'] + df['location'].unique().tolist()
-                    selected_locations = st.multiselect("Pilih Lokasi(s)", unique_locations, default=['Semua'])
+                    selected_locations = st.multiselect("Pilih Lokasi(s)", unique_locations, key='filter_locations',
+                                                        **widget_default('filter_locations', default=['Semua']))
 
-                    min_date_df = df['date'].min().date()
-                    max_date_df = df['date'].max().date()
+                    min_date_df, max_date_df = full_date_range(dataset)
                     date_range_values = st.date_input(
                         "Pilih Rentang Tanggal",
-                        value=(min_date_df, max_date_df),
                         min_value=min_date_df,
-                        max_value=max_date_df
+                        max_value=max_date_df,
+                        key='filter_date_range',
+                        **widget_default('filter_date_range', value=(min_date_df, max_date_df))
                     )
                     start_date_filter = date_range_values[0]
                     end_date_filter = date_range_values[1] if len(date_range_values) > 1 else date_range_values[0]
 
 
-                # Apply filters to create df_filtered
-                df_filtered = df.copy()
-
-                if 'Semua' not in selected_platforms:
-                    df_filtered = df_filtered[df_filtered['platform'].isin(selected_platforms)]
-                if 'Semua' not in selected_sentiments:
-                    df_filtered = df_filtered[df_filtered['sentiment'].isin(selected_sentiments)]
-                if 'Semua' not in selected_media_types:
-                    df_filtered = df_filtered[df_filtered['media_type'].isin(selected_media_types)]
-                if 'Semua' not in selected_locations:
-                    df_filtered = df_filtered[df_filtered['location'].isin(selected_locations)]
-
-                df_filtered = df_filtered[(df_filtered['date'].dt.date >= start_date_filter) &
-                                          (df_filtered['date'].dt.date <= end_date_filter)]
-
-
-                if df_filtered.empty:
+                filter_selections = {
+                    'platform': None if 'Semua' in selected_platforms else selected_platforms,
+                    'sentiment': None if 'Semua' in selected_sentiments else selected_sentiments,
+                    'media_type': None if 'Semua' in selected_media_types else selected_media_types,
+                    'location': None if 'Semua' in selected_locations else selected_locations,
+                }
+                filter_date_range = (start_date_filter, end_date_filter)
+
+                # KPIs, charts and insights are answered from the dataset's pre-aggregated rollup cube;
+                # raw rows are only filtered for the export below. Results are cached per session under
+                # the normalised filter state, so reruns that don't change the filters (and going back to
+                # an earlier combination) skip the filtering and aggregation entirely. Selections are
+                # normalised against the cube's categories, so the raw-row index is only built for an export.
+                filter_selections = dataset.cube.index.normalize(filter_selections)
+                filter_cache_key = (dataset.key, filter_state_key(filter_selections, filter_date_range))
+                with stage('filter', cache_hit=True) as stage_context:
+                    def summarize():
+                        stage_context['cache_hit'] = False
+                        return dataset.cube.summarize(filter_selections, date_range=filter_date_range)
+                    summary = st.session_state.filter_result_cache.get_or_load(filter_cache_key, summarize)
+                    stage_context['filtered_rows'] = summary.num_rows
+
+                if summary.empty:
                     st.warning("Tidak ada data yang cocok dengan filter yang dipilih. Harap sesuaikan filter Anda atau unggah file CSV yang berbeda.")
                 else:
                     # --- Dynamic KPIs ---
-                    with st.container():
-                        st.subheader("Key Performance Indicators (KPIs)")
-                        kpi1, kpi2, kpi3 = st.columns(3)
-
-                        with kpi1:
-                            total_engagements_kpi = df_filtered['engagements'].sum()
-                            st.metric(label="TOTAL ENGAGEMENTS", value=f"{total_engagements_kpi:,.0f}")
-
-                        with kpi2:
-                            unique_platforms_kpi = df_filtered['platform'].nunique()
-                            st.metric(label="PLATFORM AKTIF", value=f"{unique_platforms_kpi}")
-
-                        with kpi3:
-                            num_data_points_kpi = len(df_filtered)
-                            st.metric(label="JUMLAH DATA POINTS", value=f"{num_data_points_kpi:,.0f}")
+                    kpi_panel(summary)
 
                     # --- Visualizations Section ---
                     st.markdown("---")
@@ -694,125 +1067,23 @@ if st.session_state.page == 'Home':
                     col1, col2 = st.columns(2)
 
                     with col1:
-                        with st.container():
-                            st.write("### Distribusi Sentimen")
-                            sentiment_counts = df_filtered['sentiment'].value_counts().reset_index()
-                            sentiment_counts.columns = ['sentiment', 'count']
-                            fig_sentiment = px.pie(sentiment_counts, values='count', names='sentiment',
-                                                   title='**Distribusi Sentimen**',
-                                                   color_discrete_sequence=px.colors.qualitative.Pastel)
-                            fig_sentiment.update_layout(title_x=0.5, margin=dict(t=50, b=0, l=0, r=0),
-                                                        plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                                                        font_color='#E0E0E0')
-                            st.plotly_chart(fig_sentiment, use_container_width=True)
-                            st.markdown("#### Insight:")
-                            for insight in get_insights("Sentiment Breakdown", df_filtered):
-                                st.markdown(f"- {insight}")
+                        chart_panel("Distribusi Sentimen", "Sentiment Breakdown", summary)
 
                     with col2:
-                        with st.container():
-                            st.write("### Tren Engagement dari Waktu ke Waktu")
-                            engagement_over_time = df_filtered.groupby(df_filtered['date'].dt.to_period('W'))['engagements'].sum().reset_index()
-                            engagement_over_time['date'] = engagement_over_time['date'].dt.start_time
-                            fig_engagement_trend = px.line(engagement_over_time, x='date', y='engagements',
-                                                         title='**Tren Engagement dari Waktu ke Waktu (Mingguan)**', markers=True,
-                                                         color_discrete_sequence=["#4A90E2"])
-                            fig_engagement_trend.update_xaxes(title_text='Tanggal (Awal Minggu)', gridcolor='#2C425C', zerolinecolor='#2C425C')
-                            fig_engagement_trend.update_yaxes(title_text='Total Engagements', gridcolor='#2C425C', zerolinecolor='#2C425C')
-                            fig_engagement_trend.update_layout(title_x=0.5, margin=dict(t=50, b=0, l=0, r=0),
-                                                                plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                                                                font_color='#E0E0E0')
-                            st.plotly_chart(fig_engagement_trend, use_container_width=True)
-                            st.markdown("#### Insight:")
-                            for insight in get_insights("Engagement Trend over Time", df_filtered):
-                                st.markdown(f"- {insight}")
+                        trend_panel(summary, start_date_filter, end_date_filter)
 
                     # --- Row 2: Platform Engagements & Media Type Mix ---
                     col3, col4 = st.columns(2)
 
                     with col3:
-                        with st.container():
-                            st.write("### Engagement per Platform")
-                            platform_engagements = df_filtered.groupby('platform')['engagements'].sum().sort_values(ascending=True).reset_index()
-                            fig_platform = px.bar(platform_engagements, x='engagements', y='platform', orientation='h',
-                                                 title='**Total Engagement per Platform**',
-                                                 color='platform',
-                                                 color_discrete_sequence=px.colors.qualitative.Set2)
-                            fig_platform.update_xaxes(title_text='Total Engagements', gridcolor='#2C425C', zerolinecolor='#2C425C')
-                            fig_platform.update_yaxes(title_text='Platform', categoryarray=platform_engagements['platform'].tolist(), categoryorder="array")
-                            fig_platform.update_layout(title_x=0.5, margin=dict(t=50, b=0, l=0, r=0),
-                                                       plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                                                       font_color='#E0E0E0')
-                            st.plotly_chart(fig_platform, use_container_width=True)
-                            st.markdown("#### Insight:")
-                            for insight in get_insights("Platform Engagements", df_filtered):
-                                st.markdown(f"- {insight}")
+                        chart_panel("Engagement per Platform", "Platform Engagements", summary)
 
                     with col4:
-                        with st.container():
-                            st.write("### Distribusi Tipe Media")
-                            media_type_counts = df_filtered['media_type'].value_counts().reset_index()
-                            media_type_counts.columns = ['media_type', 'count']
-                            fig_media_type = px.pie(media_type_counts, values='count', names='media_type',
-                                                   title='**Distribusi Tipe Media**',
-                                                   color_discrete_sequence=px.colors.qualitative.Vivid)
-                            fig_media_type.update_layout(title_x=0.5, margin=dict(t=50, b=0, l=0, r=0),
-                                                         plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                                                         font_color='#E0E0E0')
-                            st.plotly_chart(fig_media_type, use_container_width=True)
-                            st.markdown("#### Insight:")
-                            for insight in get_insights("Media Type Mix", df_filtered):
-                                st.markdown(f"- {insight}")
+                        chart_panel("Distribusi Tipe Media", "Media Type Mix", summary)
 
                     # --- Row 3: Top 5 Locations & Geographical Engagement ---
-                    with st.container():
-                        st.write("### Top 5 Lokasi Berdasarkan Engagement")
-                        top_locations = df_filtered.groupby('location')['engagements'].sum().nlargest(5).sort_values(ascending=True).reset_index()
-                        fig_locations = px.bar(top_locations, x='engagements', y='location', orientation='h',
-                                              title='**Top 5 Lokasi Berdasarkan Total Engagement**',
-                                              color='location',
-                                              color_discrete_sequence=px.colors.qualitative.Dark24)
-                        fig_locations.update_xaxes(title_text='Total Engagements', gridcolor='#2C425C', zerolinecolor='#2C425C')
-                        fig_locations.update_yaxes(title_text='Lokasi', categoryarray=top_locations['location'].tolist(), categoryorder="array")
-                        fig_locations.update_layout(title_x=0.5, margin=dict(t=50, b=0, l=0, r=0),
-                                                    plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                                                    font_color='#E0E0E0')
-                        st.plotly_chart(fig_locations, use_container_width=True)
-                        st.markdown("#### Insight:")
-                        for insight in get_insights("Top 5 Locations", df_filtered):
-                            st.markdown(f"- {insight}")
-
-                    with st.container():
-                        st.write("### Peta Engagement Geografis (Eksperimental)")
-                        st.info("Peta ini akan bekerja paling baik jika kolom 'Location' Anda berisi nama kota atau negara yang dapat dikenali oleh Plotly.")
-                        try:
-                            location_engagements_map = df_filtered.groupby('location')['engagements'].sum().reset_index()
-                            location_engagements_map.columns = ['location', 'total_engagements']
-                            fig_geo = px.scatter_geo(
-                                location_engagements_map,
-                                locations="location",
-                                locationmode="country names", # Adjust based on your 'location' column data (e.g., 'country names', 'USA-states', 'ISO-3')
-                                size="total_engagements",
-                                hover_name="location",
-                                color="total_engagements",
-                                title="**Peta Engagement Berdasarkan Lokasi**",
-                                projection="natural earth",
-                                color_continuous_scale=px.colors.sequential.Plasma # Better color scale for geo map
-                            )
-                            fig_geo.update_layout(title_x=0.5, margin=dict(t=50, b=0, l=0, r=0),
-                                                 plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                                                 font_color='#E0E0E0',
-                                                 geo=dict(bgcolor='rgba(0,0,0,0)', lakecolor='#1F3850', landcolor='#0F1C3F', # Customize map colors
-                                                          subunitcolor='#2C425C', countrycolor='#2C425C'))
-                            st.plotly_chart(fig_geo, use_container_width=True)
-                            st.markdown("#### Insight:")
-                            for insight in get_insights("Geographical Engagement", df_filtered):
-                                st.markdown(f"- {insight}")
-
-                        except Exception as e:
-                            st.warning(f"Tidak dapat membuat peta geografis: {e}. Pastikan data 'Location' Anda valid (nama kota/negara) dan konsisten.")
-                            st.info("Jika data lokasi Anda tidak dikenali oleh Plotly (misalnya, hanya nama provinsi atau kode lokal), peta mungkin tidak muncul.")
-
+                    chart_panel("Top 5 Lokasi Berdasarkan Engagement", "Top 5 Locations", summary)
+                    geo_panel(summary, dataset)
 
                     st.markdown("---")
 
@@ -834,21 +1105,8 @@ if st.session_state.page == 'Home':
 
                     st.markdown("---")
                     # --- Export Data Button (di Sidebar) ---
-                    st.sidebar.header("Ekspor Data")
-                    # Create a buffer to write to
-                    buffer = io.BytesIO()
-                    # Write DataFrame to Excel in the buffer
-                    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                        df_filtered.to_excel(writer, index=False, sheet_name='Filtered_Data')
-                    buffer.seek(0) # Rewind the buffer to the beginning
-
-                    st.sidebar.download_button(
-                        label="Unduh Data yang Difilter (Excel)",
-                        data=buffer,
-                        file_name="filtered_media_data.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-                    st.sidebar.info("Data yang diunduh akan sesuai dengan filter yang Anda pilih di dashboard.")
+                    with st.sidebar:
+                        export_panel(dataset, summary, filter_selections, filter_date_range)
 
                     # --- Instructions for Downloading Dashboard (Main Content) ---
                     with st.container():
@@ -868,7 +1126,13 @@ if st.session_state.page == 'Home':
                 st.error(f"Terjadi kesalahan saat membaca atau memproses file: {e}")
                 st.info("Harap pastikan file CSV Anda memiliki kolom yang benar: **'Date', 'Platform', 'Sentiment', 'Location', 'Engagements', 'Media Type'** dan format datanya valid.")
 
+        if st.session_state.stage_recorder is not None:
+            show_diagnostics(st.session_state.stage_recorder)
+
     else:
+        # Nothing open in this session any more: let go of the dataset it was looking at
+        get_dataset_registry().release(current_session_id())
+        st.session_state.pop('filter_dataset_key', None)
         st.info("Silakan unggah file CSV Anda di sidebar untuk memulai analisis.")
 
 elif st.session_state.page == 'About':
@@ -921,5 +1185,69 @@ elif st.session_state.page == 'Contact':
     st.markdown("---")
     st.success("Terima kasih telah mengunjungi dashboard kami!")
 
+elif st.session_state.page == 'Admin' and ADMIN_VIEW_ENABLED:
+    st.header("Dataset yang Dimuat")
+    prune_ended_sessions()
+    registry = get_dataset_registry()
+    loaded_datasets = registry.entries()
+    st.caption(f"{len(loaded_datasets)} dataset dimuat di proses server ini, total {format_bytes(registry.total_bytes)}.")
+    if loaded_datasets:
+        st.dataframe(
+            [
+                {
+                    'Dataset': entry['source_name'] or entry['key'][:12],
+                    'Kunci': entry['key'][:12],
+                    'Baris': entry['rows'],
+                    'Memori Data': format_bytes(entry['data_bytes']),
+                    'Memori Indeks': format_bytes(entry['index_bytes']),
+                    'Sesi Aktif': entry['sessions'],
+                }
+                for entry in loaded_datasets
+            ],
+            width='stretch'
+        )
+    else:
+        st.info("Belum ada dataset yang dimuat.")
+
+    st.header("Dataset Tersimpan")
+    store = get_dataset_store()
+    stored_datasets = store.list_datasets()
+    st.caption(f"{len(stored_datasets)} dataset tersimpan, total {format_bytes(store.total_bytes)} dari batas {format_bytes(store.max_bytes)}; "
+               f"dataset yang tidak dipakai selama {store.max_age_days:g} hari dihapus otomatis.")
+    if stored_datasets:
+        st.dataframe(
+            [
+                {
+                    'Dataset': meta.get('source_name') or meta['key'][:12],
+                    'Kunci': meta['key'][:12],
+                    'Baris': meta['rows'],
+                    'Ukuran': format_bytes(meta['bytes']),
+                    'Disimpan': meta['saved_at'],
+                }
+                for meta in stored_datasets
+            ],
+            width='stretch'
+        )
+
+    st.header("Pekerjaan Ingest di Latar Belakang")
+    ingest_jobs = get_ingest_jobs().entries()
+    if ingest_jobs:
+        st.dataframe(
+            [
+                {
+                    'Kunci': job.key[:12],
+                    'Status': job.status,
+                    'Baris Dibaca': job.rows_read,
+                    'Progres': f"{job.fraction:.0%}",
+                    'Mulai': datetime.datetime.fromtimestamp(job.started_at).strftime('%H:%M:%S'),
+                    'Durasi (s)': round((job.finished_at or time.time()) - job.started_at, 1),
+                }
+                for job in ingest_jobs
+            ],
+            width='stretch'
+        )
+    else:
+        st.info("Tidak ada pekerjaan ingest.")
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("Dibuat dengan ❤️ oleh Shannon Sifra")
@@ -0,0 +1,35 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# The dashboard modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def media_frame(dates, date_format='%Y-%m-%d', **columns):
+    """Upload-schema frame with one row per date; ``Engagements`` is each row's day of the year
+    (so a mis-parsed date shows up row by row), other columns default to constants."""
+    dates = pd.DatetimeIndex(dates)
+    frame = pd.DataFrame({
+        'Date': dates.strftime(date_format),
+        'Platform': 'Instagram',
+        'Sentiment': 'positive',
+        'Location': 'Jakarta',
+        'Engagements': dates.dayofyear,
+        'Media Type': 'video',
+    })
+    for name, values in columns.items():
+        frame[name] = values
+    return frame
+
+
+@pytest.fixture
+def media_csv():
+    """Builder for CSV bytes in the upload schema, see ``media_frame``."""
+    def build(dates, date_format='%Y-%m-%d', **columns):
+        return media_frame(dates, date_format, **columns).to_csv(index=False).encode()
+    return build
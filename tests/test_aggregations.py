@@ -0,0 +1,117 @@
+# tests/test_aggregations.py
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregations import RollupCube, build_rollup, combine_rollups, summarize
+from analysis import read_dataset
+from filters import FilterIndex
+from ingest import Dataset, read_media_csv
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory):
+    from benchmarks.synthetic import generate_media_csv
+
+    path = generate_media_csv(tmp_path_factory.mktemp('data') / 'media.csv', 20_000, locations=40, days=200)
+    df, report = read_media_csv(path.read_bytes())
+    return Dataset('key', df, report=report)
+
+
+FILTER_CASES = [
+    ({}, None),
+    ({'platform': ['Instagram', 'TikTok']}, None),
+    ({'location': ['Jakarta', 'Bandung', 'Lokasi tidak ada'], 'sentiment': ['negative']}, None),
+    ({}, (datetime.date(2023, 2, 1), datetime.date(2023, 3, 15))),
+    ({'media_type': ['video'], 'location': []}, (datetime.date(2023, 2, 1), datetime.date(2023, 3, 15))),
+    ({'media_type': ['video', 'reel']}, (datetime.date(2023, 7, 1), datetime.date(2023, 7, 1))),
+]
+
+
+def assert_summaries_equal(actual, expected):
+    assert actual.num_rows == expected.num_rows
+    assert actual.total_engagements == expected.total_engagements
+    for table in ['sentiment_counts', 'media_type_counts', 'platform_engagements', 'location_engagements',
+                  'daily_engagements']:
+        pd.testing.assert_series_equal(getattr(actual, table).sort_index().astype('int64'),
+                                       getattr(expected, table).sort_index().astype('int64'),
+                                       check_index_type=False, check_categorical=False)
+    pd.testing.assert_frame_equal(actual.weekly_engagements.astype({'engagements': 'int64'}),
+                                  expected.weekly_engagements.astype({'engagements': 'int64'}))
+
+
+@pytest.mark.parametrize('selections, date_range', FILTER_CASES)
+def test_cube_summary_matches_raw_rows(dataset, selections, date_range):
+    from_cube = dataset.cube.summarize(selections, date_range=date_range)
+    from_rows = summarize(dataset.filter_index.apply(dataset.df, selections, date_range=date_range))
+    assert_summaries_equal(from_cube, from_rows)
+
+
+def test_rollup_cells_are_compact(dataset):
+    cells = dataset.cube.cells
+    assert cells['count'].sum() == len(dataset.df)
+    assert cells['count'].dtype == np.int32
+    for col in ['platform', 'sentiment', 'media_type', 'location', 'date']:
+        assert isinstance(cells[col].dtype, pd.CategoricalDtype)
+    assert cells['date'].cat.codes.dtype.itemsize <= 2
+    assert not dataset.cube.index.bitmaps
+    assert len(dataset.cube.index.dates) == dataset.df['date'].dt.normalize().nunique()
+
+
+def test_cube_stays_compact_per_cell(dataset):
+    # Four one-byte dimension codes (plus their index copies), a day code and two int32 sums
+    assert dataset.cube.nbytes <= 20 * len(dataset.cube.cells)
+
+
+def test_combine_rollups_equals_rollup_of_all_rows(dataset):
+    df = dataset.df
+    halves = [df.iloc[::2], df.iloc[1::2]]
+    combined = RollupCube.from_cells(combine_rollups([build_rollup(half) for half in halves]))
+    assert_summaries_equal(combined.summarize({}), dataset.cube.summarize({}))
+    selections = {'platform': ['Instagram'], 'location': ['Jakarta', 'Surabaya']}
+    assert_summaries_equal(combined.summarize(selections), dataset.cube.summarize(selections))
+
+
+def test_filter_index_date_runs_match_plain_search(dataset):
+    index = dataset.filter_index
+    assert index.date_starts is not None  # one run per day
+    dates = dataset.df['date'].to_numpy()
+    start, end = datetime.date(2023, 3, 1), datetime.date(2023, 3, 31)
+    lo, hi = index.date_rows(start, end)
+    expected = np.flatnonzero((dates >= np.datetime64(start)) & (dates < np.datetime64(end + datetime.timedelta(days=1))))
+    assert (lo, hi) == (expected[0], expected[-1] + 1)
+
+
+def test_filter_index_keeps_distinct_timestamps_unencoded():
+    df = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=100, freq='h'), 'platform': 'x'})
+    index = FilterIndex(df)
+    assert index.date_starts is None
+    assert index.date_rows(datetime.date(2024, 1, 2), datetime.date(2024, 1, 2)) == (24, 48)
+
+
+def test_cube_normalizes_like_raw_row_index(dataset):
+    fresh = Dataset('fresh', dataset.df)
+    selections = {'platform': ['TikTok', 'Instagram', 'Tidak ada'], 'sentiment': ['positive', 'neutral', 'negative'],
+                  'media_type': None, 'location': []}
+    normalized = fresh.cube.index.normalize(selections)
+    assert normalized == {'platform': ['Instagram', 'TikTok'], 'sentiment': None, 'media_type': None, 'location': []}
+    fresh.cube.summarize(normalized)
+    assert fresh._filter_index is None  # only an export builds the raw-row index
+    assert normalized == fresh.filter_index.normalize(selections)
+
+
+def test_filter_index_nbytes_counts_every_array(dataset):
+    index = FilterIndex(dataset.df)
+    arrays = [index.dates, index.date_starts, *index.codes.values()]
+    arrays += [bitmap for bitmaps in index.bitmaps.values() for bitmap in bitmaps.values()]
+    assert index.nbytes == sum(array.nbytes for array in arrays)
+    assert index.nbytes >= len(dataset.df) * len(index.codes)  # at least one byte per row and dimension
+
+
+def test_read_dataset_builds_cube_and_locations_at_ingest(media_csv):
+    dataset = read_dataset(media_csv(pd.date_range('2024-01-01', periods=10, freq='D')))
+    assert dataset._cube is not None and dataset._locations is not None
+    assert dataset._filter_index is None  # only exports need the raw-row index
@@ -0,0 +1,90 @@
+# tests/test_append.py
+
+import numpy as np
+import pandas as pd
+
+from analysis import load_files
+from ingest import Dataset, already_present, file_digest, read_media_csv
+
+WEEK_ONE = pd.date_range('2024-01-01', '2024-01-07', freq='D').repeat(3)
+WEEK_TWO = pd.date_range('2024-01-08', '2024-01-14', freq='D').repeat(3)
+
+
+def dataset(file_bytes, name):
+    df, report = read_media_csv(file_bytes)
+    return Dataset(file_digest(file_bytes), df, report=report, source_name=name)
+
+
+def test_already_present_counts_occurrences():
+    existing = np.array([5, 7, 7, 9], dtype=np.uint64)
+    hashes = np.array([7, 1, 7, 7, 5, 5, 9], dtype=np.uint64)
+    assert already_present(existing, hashes).tolist() == [True, False, True, False, True, False, True]
+    assert not already_present(existing[:0], hashes).any()
+
+
+def test_append_keeps_distinct_rows_that_only_differ_in_extra_columns(media_csv):
+    first = dataset(media_csv(WEEK_ONE, ID=range(len(WEEK_ONE))), 'a.csv')
+    # Same schema values as the first file, but other article IDs: every row is new
+    second = dataset(media_csv(WEEK_ONE, ID=range(100, 100 + len(WEEK_ONE))), 'b.csv')
+    combined = first.append(second)
+    assert len(combined.df) == 2 * len(WEEK_ONE)
+    assert combined.report.get('rows_duplicate', 0) == 0
+
+
+def test_append_drops_only_as_many_rows_as_already_exist(media_csv):
+    # media_csv gives the three rows of each day identical values
+    first = dataset(media_csv(WEEK_ONE[::3]), 'a.csv')            # one copy of each day's row
+    second = dataset(media_csv(WEEK_ONE), 'b.csv')                # three copies
+    combined = first.append(second)
+    assert len(combined.df) == len(WEEK_ONE)
+    assert combined.report['rows_duplicate'] == len(WEEK_ONE) // 3
+
+
+def test_append_of_next_week_extends_cube(media_csv):
+    first = dataset(media_csv(WEEK_ONE), 'a.csv')
+    first.cube
+    combined = first.append(dataset(media_csv(pd.DatetimeIndex(WEEK_ONE).append(WEEK_TWO)), 'b.csv'))
+    assert len(combined.df) == len(WEEK_ONE) + len(WEEK_TWO)
+    assert combined.report['rows_duplicate'] == len(WEEK_ONE)
+    assert combined.df['date'].is_monotonic_increasing
+    assert combined.cube.summarize({}).num_rows == len(combined.df)
+    assert combined.source_name == 'a.csv, b.csv'
+
+
+def test_load_files_matches_one_file_with_all_rows(media_csv):
+    files = [('a.csv', media_csv(WEEK_ONE)), ('b.csv', media_csv(WEEK_TWO))]
+    loaded = load_files([(name, file_digest(file_bytes), file_bytes) for name, file_bytes in files])
+    whole, _ = read_media_csv(media_csv(pd.DatetimeIndex(WEEK_ONE).append(WEEK_TWO)))
+    pd.testing.assert_frame_equal(loaded.df, whole, check_categorical=False)
+
+
+def test_append_matches_rows_across_integer_widths(media_csv):
+    first = dataset(media_csv(WEEK_ONE, ID=range(-10, len(WEEK_ONE) - 10)), 'a.csv')
+    second = dataset(media_csv(pd.DatetimeIndex(WEEK_ONE).append(WEEK_TWO), ID=range(-10, 2 * len(WEEK_ONE) - 10)), 'b.csv')
+    second.df['id'] = second.df['id'].astype('int64')
+    assert first.df['id'].dtype != second.df['id'].dtype
+    combined = first.append(second)
+    assert combined.report['rows_duplicate'] == len(WEEK_ONE)
+
+
+def test_append_keeps_columns_only_the_first_file_has(media_csv):
+    first = dataset(media_csv(WEEK_ONE, Headline='Judul berita'), 'a.csv')
+    second = dataset(media_csv(pd.DatetimeIndex(WEEK_ONE).append(WEEK_TWO)), 'b.csv')
+    combined = first.append(second)
+    assert combined.report['rows_duplicate'] == len(WEEK_ONE)  # compared on the shared columns
+    assert list(combined.df.columns) == list(first.df.columns)
+    headlines = combined.df.set_index('date')['headline']
+    assert (headlines.loc[:'2024-01-07'] == 'Judul berita').all()
+    assert headlines.loc['2024-01-08':].isna().all()
+
+
+def test_append_keeps_columns_only_the_later_file_has(media_csv):
+    first = dataset(media_csv(WEEK_ONE), 'a.csv')
+    second = dataset(media_csv(WEEK_TWO, Headline='Judul berita', Reach=range(len(WEEK_TWO))), 'b.csv')
+    combined = first.append(second)
+    assert len(combined.df) == len(WEEK_ONE) + len(WEEK_TWO)
+    assert {'headline', 'reach'} <= set(combined.df.columns)
+    later = combined.df['date'] >= '2024-01-08'
+    assert (combined.df.loc[later, 'headline'] == 'Judul berita').all()
+    assert combined.df.loc[later, 'reach'].tolist() == list(range(len(WEEK_TWO)))
+    assert combined.df.loc[~later, ['headline', 'reach']].isna().all().all()
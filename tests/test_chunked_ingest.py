@@ -0,0 +1,67 @@
+# tests/test_chunked_ingest.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import media_frame
+from ingest import concat_compact, merge_clean_stats, read_media_csv, read_media_csv_chunked
+
+
+@pytest.fixture
+def mixed_csv():
+    # Unsorted dates, categories that only appear in some chunks, a few unusable rows
+    rng = np.random.default_rng(8)
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, 5000), unit='D')
+    frame = media_frame(dates, Note=['baris "satu"\nbaris dua'] * len(dates))
+    frame['Location'] = [f"Kota {row // 700}" for row in range(len(frame))]
+    frame['Platform'] = rng.choice(['Instagram', 'TikTok', 'X'], len(frame))
+    frame.loc[[10, 2600, 4999], 'Date'] = ['bukan tanggal', None, '']
+    frame.loc[[11, 3000], 'Engagements'] = None
+    return frame.to_csv(index=False).encode()
+
+
+def test_chunked_read_matches_whole_read(mixed_csv):
+    whole, whole_report = read_media_csv(mixed_csv)
+    chunked, chunked_report = read_media_csv_chunked(mixed_csv, chunksize=256)
+    pd.testing.assert_frame_equal(chunked, whole)
+    assert chunked['date'].is_monotonic_increasing
+    assert chunked['location'].cat.categories.tolist() == [f"Kota {number}" for number in range(8)]
+    for name in ['rows', 'rows_read', 'rows_dropped', 'dates_invalid', 'dates_missing']:
+        assert chunked_report[name] == whole_report[name], name
+    assert chunked_report['rows_dropped'] == 3
+
+
+def test_chunked_read_of_header_only_file_matches_whole_read():
+    file_bytes = media_frame([]).to_csv(index=False).encode()
+    chunked, report = read_media_csv_chunked(file_bytes)
+    assert report['rows'] == 0
+    pd.testing.assert_frame_equal(chunked, read_media_csv(file_bytes)[0])
+
+
+def test_chunked_read_of_empty_file_fails():
+    with pytest.raises(ValueError):
+        read_media_csv_chunked(b'')
+
+
+def test_concat_compact_merges_categoricals_without_decoding():
+    first = pd.DataFrame({'platform': pd.Categorical(['X', 'TikTok']), 'engagements': [1, 2]})
+    second = pd.DataFrame({'platform': pd.Categorical(['Instagram', 'X']), 'engagements': [3, 4]})
+    combined = concat_compact([first, second])
+    assert isinstance(combined['platform'].dtype, pd.CategoricalDtype)
+    assert combined['platform'].tolist() == ['X', 'TikTok', 'Instagram', 'X']
+    assert combined['engagements'].tolist() == [1, 2, 3, 4]
+
+
+def test_concat_compact_falls_back_for_incompatible_categories():
+    missing = pd.DataFrame({'note': pd.Categorical([np.nan, np.nan])})  # float categories
+    text = pd.DataFrame({'note': pd.Categorical(['a', 'b'])})
+    assert concat_compact([missing, text])['note'].tolist()[2:] == ['a', 'b']
+
+
+def test_merge_clean_stats_sums_counts_and_keeps_first_format():
+    merged = merge_clean_stats([
+        {'rows_read': 3, 'dates_invalid': 1, 'date_format': '%d/%m/%Y'},
+        {'rows_read': 2, 'dates_invalid': 0, 'date_format': None},
+    ])
+    assert merged == {'rows_read': 5, 'dates_invalid': 1, 'date_format': '%d/%m/%Y'}
@@ -0,0 +1,60 @@
+# tests/test_compact_schema.py
+
+import numpy as np
+import pandas as pd
+
+from ingest import apply_compact_schema, clean_rows, read_media_csv
+
+DATES = pd.date_range('2024-01-01', periods=40, freq='D')
+
+
+def test_dimensions_become_categoricals_and_engagements_int32(media_csv):
+    df, report = read_media_csv(media_csv(DATES))
+    for col in ['platform', 'sentiment', 'media_type', 'location']:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+    assert df['engagements'].dtype == np.int32
+    assert df['date'].dtype == 'datetime64[ns]'
+    assert report['memory_after'] < report['memory_before']
+
+
+def test_engagements_too_large_for_int32_stay_int64():
+    df = pd.DataFrame({'date': DATES[:2], 'engagements': np.array([1, 2 ** 31], dtype='int64')})
+    df, _ = apply_compact_schema(df)
+    assert df['engagements'].dtype == np.int64
+    assert df['engagements'].iloc[1] == 2 ** 31
+
+
+def test_extra_columns_are_downcast_or_categorised():
+    rows = len(DATES)
+    df = pd.DataFrame({
+        'date': DATES,
+        'engagements': np.arange(rows),
+        'reach': np.arange(rows, dtype='int64') * 1000,
+        'score': np.linspace(0, 1, rows),
+        'author': ['a', 'b'] * (rows // 2),
+        'url': [f"https://example.com/{number}" for number in range(rows)],
+        'verified': [True, False] * (rows // 2),
+    })
+    df, _ = apply_compact_schema(df)
+    assert df['reach'].dtype == np.int32
+    assert df['score'].dtype == np.float32
+    assert isinstance(df['author'].dtype, pd.CategoricalDtype)
+    assert not isinstance(df['url'].dtype, pd.CategoricalDtype)  # mostly distinct values
+    assert df['verified'].dtype == bool
+
+
+def test_timezone_aware_dates_keep_wall_clock_time():
+    df = pd.DataFrame({'date': pd.to_datetime(['2024-03-01 23:30+07:00']), 'engagements': [1]})
+    df, _ = apply_compact_schema(df)
+    assert df['date'].iloc[0] == pd.Timestamp('2024-03-01 23:30')
+
+
+def test_cleaning_drops_invalid_dates_and_fills_engagements():
+    raw = pd.DataFrame({
+        'Date': ['2024-01-01', 'bukan tanggal', None, '2024-01-02'],
+        'Platform': 'x', 'Sentiment': 'positive', 'Location': 'Jakarta', 'Media Type': 'video',
+        'Engagements': ['5', 'n/a', '3', ''],
+    })
+    df, stats = clean_rows(raw)
+    assert df['engagements'].tolist() == [5, 0]
+    assert (stats['rows_read'], stats['rows_dropped'], stats['dates_invalid'], stats['dates_missing']) == (4, 2, 1, 1)
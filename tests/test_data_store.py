@@ -0,0 +1,71 @@
+# tests/test_data_store.py
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from data_store import DatasetStore
+from ingest import read_media_csv
+
+pytest.importorskip('pyarrow')
+
+DATES = pd.date_range('2024-01-01', periods=200, freq='D')
+
+
+@pytest.fixture
+def frame(media_csv):
+    return read_media_csv(media_csv(DATES))[0]
+
+
+def set_last_used(store, key, seconds_ago):
+    path = os.path.join(store.root, f"{key}.feather")
+    used = time.time() - seconds_ago
+    os.utime(path, (used, used))
+
+
+def test_save_and_load_round_trip(tmp_path, frame):
+    store = DatasetStore(tmp_path)
+    store.save('a', frame, source_name='a.csv', report={'rows': len(frame)})
+    assert 'a' in store
+    pd.testing.assert_frame_equal(store.load('a'), frame)
+    meta, = store.list_datasets()
+    assert meta['source_name'] == 'a.csv' and meta['rows'] == len(frame) and meta['bytes'] > 0
+
+
+def test_list_datasets_only_for_given_keys(tmp_path, frame):
+    store = DatasetStore(tmp_path)
+    store.save('a', frame)
+    store.save('b', frame)
+    assert [meta['key'] for meta in store.list_datasets(keys={'b'})] == ['b']
+    assert store.list_datasets(keys=set()) == []
+    assert {meta['key'] for meta in store.list_datasets()} == {'a', 'b'}
+
+
+def test_save_evicts_least_recently_used_over_size_limit(tmp_path, frame):
+    store = DatasetStore(tmp_path)
+    store.save('a', frame)
+    store.max_bytes = int(2.5 * store.total_bytes)
+    store.save('b', frame)
+    set_last_used(store, 'a', 60)
+    set_last_used(store, 'b', 120)
+    store.load('b')  # now the most recently used
+    store.save('c', frame)
+    assert 'a' not in store and 'b' in store and 'c' in store
+    assert not os.path.exists(os.path.join(tmp_path, 'a.json'))
+
+
+def test_prune_deletes_datasets_past_age_limit(tmp_path, frame):
+    store = DatasetStore(tmp_path, max_age_days=1)
+    store.save('old', frame)
+    store.save('new', frame)
+    set_last_used(store, 'old', 2 * 24 * 3600)
+    assert store.prune() == ['old']
+    assert 'new' in store
+
+
+def test_just_saved_dataset_is_kept_even_over_limit(tmp_path, frame):
+    store = DatasetStore(tmp_path, max_bytes=1)
+    store.save('a', frame)
+    assert 'a' in store
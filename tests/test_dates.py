@@ -0,0 +1,140 @@
+# tests/test_dates.py
+
+import warnings
+
+import pandas as pd
+import pytest
+
+from ingest import (
+    DateParser,
+    infer_date_format,
+    read_media_csv,
+    read_media_csv_chunked,
+    sample_csv_dates,
+    swap_day_month,
+)
+
+# A year of daily dates, 100 rows each: the first 1,000 rows only have days 1-10
+SORTED_DATES = pd.date_range('2024-01-01', '2024-12-31', freq='D').repeat(100)
+
+
+def assert_dates_match_engagements(df):
+    # media_csv stores each row's day of the year in Engagements
+    assert (df['date'].dt.dayofyear == df['engagements']).all()
+
+
+def test_swap_day_month():
+    assert swap_day_month('%d/%m/%Y') == '%m/%d/%Y'
+    assert swap_day_month('%m/%d/%Y %H:%M') == '%d/%m/%Y %H:%M'
+    assert swap_day_month('%d %b %Y') is None
+
+
+def test_infer_date_format_prefers_day_first_when_ambiguous():
+    assert infer_date_format(['03/04/2024', '01/02/2024', '12/11/2024']) == '%d/%m/%Y'
+
+
+def test_infer_date_format_follows_disambiguating_value():
+    assert infer_date_format(['03/04/2024', '01/02/2024', '01/25/2024']) == '%m/%d/%Y'
+    assert infer_date_format(['03/04/2024', '01/02/2024', '25/01/2024']) == '%d/%m/%Y'
+
+
+def test_infer_date_format_checks_values_beyond_scored_sample():
+    # Only one value out of thousands tells the two conventions apart
+    sample = [f"{month:02d}/{day:02d}/{year}" for year in range(2000, 2030) for month in range(1, 13) for day in range(1, 13)]
+    sample.insert(1, '12/31/2029')
+    assert infer_date_format(sample) == '%m/%d/%Y'
+
+
+def test_infer_date_format_does_not_warn():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert infer_date_format(['25/03/2024', '26/03/2024']) == '%d/%m/%Y'
+
+
+def test_iso_dates():
+    assert infer_date_format(['2024-03-04', '2024-12-31']) == '%Y-%m-%d'
+
+
+def test_date_parser_parses_each_distinct_value_once_across_chunks():
+    parser = DateParser()
+    first, stats = parser.parse(pd.Series(['2024-03-04', '2024-03-05', None, 'bukan tanggal']))
+    assert parser.date_format == '%Y-%m-%d'
+    assert stats == {'dates_fallback': 0, 'dates_invalid': 1, 'dates_missing': 1}
+    assert first.iloc[0] == pd.Timestamp('2024-03-04')
+
+    second, stats = parser.parse(pd.Series(['2024-03-05', '05/03/2024 10:00']))
+    assert second.iloc[0] == pd.Timestamp('2024-03-05')
+    assert stats['dates_fallback'] == 1
+
+
+def test_fallback_keeps_day_first_order():
+    parser = DateParser(date_format='%d/%m/%Y')
+    parsed, stats = parser.parse(pd.Series(['03/04/2024', '03/04/2024 10:30']))
+    assert stats['dates_fallback'] == 1
+    assert parsed.iloc[1] == pd.Timestamp('2024-04-03 10:30')
+
+
+def test_sample_csv_dates_spans_whole_file(media_csv):
+    file_bytes = media_csv(SORTED_DATES, '%d/%m/%Y')
+    sample = sample_csv_dates(file_bytes, windows=8, window_bytes=2048)
+    days = {int(value[:2]) for value in sample}
+    assert max(days) > 12
+    assert infer_date_format(sample) == '%d/%m/%Y'
+
+
+def test_sample_csv_dates_without_date_column():
+    assert sample_csv_dates(b'a,b\n1,2\n') == []
+    assert sample_csv_dates(b'') == []
+
+
+def test_chunked_read_of_sorted_day_first_file(media_csv):
+    file_bytes = media_csv(SORTED_DATES, '%d/%m/%Y')
+    whole, whole_report = read_media_csv(file_bytes)
+    chunked, chunked_report = read_media_csv_chunked(file_bytes, chunksize=1000)
+
+    assert chunked_report['date_format'] == whole_report['date_format'] == '%d/%m/%Y'
+    assert chunked_report['dates_fallback'] == 0
+    assert_dates_match_engagements(whole)
+    assert_dates_match_engagements(chunked)
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_chunked_read_of_sorted_month_first_file(media_csv):
+    file_bytes = media_csv(SORTED_DATES, '%m/%d/%Y')
+    chunked, report = read_media_csv_chunked(file_bytes, chunksize=1000)
+    assert report['date_format'] == '%m/%d/%Y'
+    assert_dates_match_engagements(chunked)
+
+
+ONE_WEEK = pd.date_range('2024-03-01 10:30', periods=7, freq='D')
+
+
+@pytest.mark.parametrize('date_format, expected_format', [
+    ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M'),
+    ('%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M:%S%z'),
+    ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%f'),
+    ('%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S%z'),
+])
+def test_one_week_of_year_first_timestamps_reads_month_before_day(media_csv, date_format, expected_format):
+    # Every day is <= 12, so only the year-first rule keeps these from reading as %Y-%d-%m
+    dates = ONE_WEEK.tz_localize('UTC') if '%z' in date_format else ONE_WEEK
+    sample = dates.strftime(date_format).tolist()
+    assert infer_date_format(sample) == expected_format
+
+    df, report = read_media_csv(media_csv(ONE_WEEK.tz_localize('UTC'), date_format))
+    assert report['dates_invalid'] == 0
+    assert sorted(df['date'].dt.normalize().unique()) == list(ONE_WEEK.normalize())
+
+
+def test_year_day_month_twin_is_never_chosen():
+    sample = [f"2024-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 13)] * 10
+    sample.append('2024-13-01')  # only readable as %Y-%d-%m
+    assert infer_date_format(sample) == '%Y-%m-%d'
+
+
+def test_mixed_utc_offsets_use_the_utc_fallback():
+    parser = DateParser()
+    parsed, stats = parser.parse(pd.Series(['2024-03-01T10:00:00+07:00', '2024-03-02T10:00:00+00:00']))
+    assert parser.date_format == '%Y-%m-%dT%H:%M:%S%z'
+    assert stats['dates_invalid'] == 0
+    assert parsed.tolist() == [pd.Timestamp('2024-03-01 03:00'), pd.Timestamp('2024-03-02 10:00')]
@@ -0,0 +1,65 @@
+# tests/test_diagnostics.py
+
+import threading
+import tracemalloc
+
+from diagnostics import StageRecorder
+
+
+def test_stages_record_time_and_memory_of_nested_stages():
+    recorder = StageRecorder(session='s1')
+    with recorder.stage('outer'):
+        with recorder.stage('inner', chart='x') as context:
+            context['rows'] = 3
+            data = bytearray(4 * 1024 ** 2)
+        del data
+
+    outer, inner = recorder.records
+    assert [outer['stage'], inner['stage']] == ['outer', 'inner']
+    assert (outer['depth'], inner['depth']) == (0, 1)
+    assert inner['chart'] == 'x' and inner['rows'] == 3 and inner['session'] == 's1'
+    assert inner['peak_memory_delta'] >= 4 * 1024 ** 2
+    assert outer['peak_memory_delta'] >= inner['peak_memory_delta']
+
+
+def test_tracing_stops_when_last_stage_closes():
+    assert not tracemalloc.is_tracing()
+    first, second = StageRecorder(), StageRecorder()
+    opened, release = threading.Event(), threading.Event()
+
+    def other_session():
+        with second.stage('ingest'):
+            opened.set()
+            release.wait()
+
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    opened.wait()
+    with first.stage('filter'):
+        assert tracemalloc.is_tracing()
+    assert tracemalloc.is_tracing()  # the other session's stage is still open
+    release.set()
+    thread.join()
+    assert not tracemalloc.is_tracing()
+    assert first.records[0]['peak_memory_delta'] is not None
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        with StageRecorder().stage('chart'):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_extend_nests_records_under_open_stage():
+    job_recorder = StageRecorder()
+    with job_recorder.stage('read_and_clean_chunks'):
+        pass
+    recorder = StageRecorder()
+    with recorder.stage('ingest'):
+        recorder.extend(job_recorder.records)
+    assert [(record['stage'], record['depth']) for record in recorder.records] == [
+        ('ingest', 0), ('read_and_clean_chunks', 1)]
@@ -0,0 +1,199 @@
+# tests/test_exporting.py
+
+import os
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import exporting
+from caching import SizedLRUCache
+from exporting import EXPORT_FORMATS, ExportCache, estimate_export_bytes, pq, write_export
+from ingest import DatasetRegistry, read_media_csv
+
+
+@pytest.fixture(scope='module')
+def media_df(tmp_path_factory):
+    from benchmarks.synthetic import generate_media_csv
+
+    path = generate_media_csv(tmp_path_factory.mktemp('data') / 'media.csv', 6000, days=60)
+    return read_media_csv(path.read_bytes())[0]
+
+
+@pytest.mark.parametrize('export_format', list(EXPORT_FORMATS))
+def test_estimate_is_close_to_the_written_size(media_df, export_format, tmp_path):
+    path = tmp_path / f"export{EXPORT_FORMATS[export_format]['suffix']}"
+    write_export(media_df, path, export_format)
+    actual = os.path.getsize(path)
+    estimate = estimate_export_bytes(media_df, len(media_df), export_format, sample_rows=1000)
+    assert 0.7 * actual <= estimate <= 2 * actual
+    assert estimate_export_bytes(media_df, 0, export_format) == 0
+
+
+def test_failed_writer_releases_its_key(tmp_path):
+    cache = ExportCache(directory=str(tmp_path))
+
+    def failing_writer(path):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        cache.get_or_create('key', '.csv', failing_writer)
+    assert not cache._inflight and not os.listdir(tmp_path)
+    path = cache.get_or_create('key', '.csv', text_writer('a\n1\n'))
+    assert os.path.exists(path) and not cache._inflight
+
+
+def test_failed_loaders_release_their_keys():
+    def failing_loader():
+        raise ValueError("bukan CSV")
+
+    cache = SizedLRUCache(max_entries=4, max_bytes=1024)
+    with pytest.raises(ValueError):
+        cache.get_or_load('key', failing_loader)
+    assert not cache._inflight
+
+    registry = DatasetRegistry()
+    with pytest.raises(ValueError):
+        registry.acquire('session', 'key', failing_loader)
+    assert not registry._inflight and 'key' not in registry
+
+
+# --- Writers ---
+def xlsx_sheets(path):
+    """Cell values of each worksheet by sheet name, one dict (column letter -> value) per row;
+    numbers are floats and empty cells are absent. Read from the XML, as no xlsx reader is installed."""
+    ns = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+    with zipfile.ZipFile(path) as workbook:
+        shared = []
+        if 'xl/sharedStrings.xml' in workbook.namelist():
+            shared = [item.findtext('.//x:t', namespaces=ns)
+                      for item in ElementTree.fromstring(workbook.read('xl/sharedStrings.xml')).findall('x:si', ns)]
+        names = [sheet.get('name') for sheet in ElementTree.fromstring(workbook.read('xl/workbook.xml')).iter(f"{{{ns['x']}}}sheet")]
+        sheets = {}
+        for number, name in enumerate(names, start=1):
+            rows = []
+            for row in ElementTree.fromstring(workbook.read(f"xl/worksheets/sheet{number}.xml")).iter(f"{{{ns['x']}}}row"):
+                cells = {}
+                for cell in row.findall('x:c', ns):
+                    column = cell.get('r').rstrip('0123456789')
+                    if cell.get('t') == 'inlineStr':
+                        cells[column] = cell.findtext('.//x:t', namespaces=ns)
+                    elif cell.get('t') == 's':
+                        cells[column] = shared[int(cell.findtext('x:v', namespaces=ns))]
+                    else:
+                        cells[column] = float(cell.findtext('x:v', namespaces=ns))
+                rows.append(cells)
+            sheets[name] = rows
+    return sheets
+
+
+@pytest.fixture
+def small_df():
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2024-01-01 10:00', None] + ['2024-01-03 00:00'] * 9),
+        'platform': pd.Categorical(['X', None] + ['TikTok'] * 9),
+        'engagements': np.arange(11, dtype='int32'),
+    })
+
+
+def test_constant_memory_excel_splits_sheets_at_row_limit(monkeypatch, small_df, tmp_path):
+    monkeypatch.setattr(exporting, 'EXCEL_MAX_ROWS', 5)  # header plus four data rows per sheet
+    exporting.write_excel_constant_memory(small_df, tmp_path / 'out.xlsx')
+    sheets = xlsx_sheets(tmp_path / 'out.xlsx')
+    assert list(sheets) == ['Filtered_Data', 'Filtered_Data_2', 'Filtered_Data_3']
+    assert [len(rows) - 1 for rows in sheets.values()] == [4, 4, 3]
+    assert all(rows[0] == {'A': 'date', 'B': 'platform', 'C': 'engagements'} for rows in sheets.values())
+    values = [row['C'] for rows in sheets.values() for row in rows[1:]]
+    assert values == list(range(11))
+
+
+def test_constant_memory_excel_writes_datetimes_and_skips_missing_cells(small_df, tmp_path):
+    exporting.write_excel_constant_memory(small_df, tmp_path / 'out.xlsx')
+    rows = xlsx_sheets(tmp_path / 'out.xlsx')['Filtered_Data']
+    assert rows[1] == {'A': pytest.approx(45292 + 10 / 24), 'B': 'X', 'C': 0.0}  # Excel serial date
+    assert rows[2] == {'C': 1.0}  # NaT and missing category stay empty
+
+
+@pytest.mark.parametrize('min_rows, inline_strings', [(0, True), (1000, False)])
+def test_write_excel_picks_writer_by_row_count(monkeypatch, small_df, tmp_path, min_rows, inline_strings):
+    monkeypatch.setattr(exporting, 'EXCEL_CONSTANT_MEMORY_MIN_ROWS', min_rows)
+    exporting.write_excel(small_df, tmp_path / 'out.xlsx', rows=np.array([0, 2, 3]))
+    with zipfile.ZipFile(tmp_path / 'out.xlsx') as workbook:
+        assert ('xl/sharedStrings.xml' not in workbook.namelist()) == inline_strings
+    rows = xlsx_sheets(tmp_path / 'out.xlsx')['Filtered_Data']
+    assert [row['C'] for row in rows[1:]] == [0.0, 2.0, 3.0]
+
+
+def exported_rows(path, export_format):
+    if export_format == 'xlsx':
+        return sum(len(rows) - 1 for rows in xlsx_sheets(path).values())
+    if export_format == 'parquet':
+        return pq.read_metadata(path).num_rows
+    return len(pd.read_csv(path))  # gzip is inferred from the suffix
+
+
+@pytest.mark.parametrize('export_format', list(EXPORT_FORMATS))
+@pytest.mark.parametrize('rows, expected', [(None, 11), (slice(2, 9), 7), (np.array([1, 4, 10]), 3),
+                                            (np.array([], dtype='int64'), 0)])
+def test_row_counts_per_format(monkeypatch, small_df, tmp_path, export_format, rows, expected):
+    monkeypatch.setattr(exporting, 'EXCEL_MAX_ROWS', 3)
+    monkeypatch.setattr(exporting, 'EXCEL_CONSTANT_MEMORY_MIN_ROWS', 2)
+    path = tmp_path / f"out{EXPORT_FORMATS[export_format]['suffix']}"
+    write_export(small_df, path, export_format, rows=rows)
+    assert exported_rows(path, export_format) == expected
+
+
+@pytest.mark.skipif(pq is None, reason="pyarrow is not installed")
+def test_parquet_keeps_one_schema_across_chunks(tmp_path):
+    rows = exporting.EXPORT_CHUNK_ROWS + 10
+    df = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=rows, freq='min').where(np.arange(rows) % 7 != 0),
+        # The first chunk only holds one of the categories
+        'platform': pd.Categorical(['X'] * (rows - 10) + ['TikTok'] * 10),
+        'engagements': np.arange(rows, dtype='int32'),
+    })
+    exporting.write_parquet(df, tmp_path / 'out.parquet')
+    back = pd.read_parquet(tmp_path / 'out.parquet')
+    assert len(back) == rows
+    assert back['date'].isna().sum() == df['date'].isna().sum()
+    assert back['platform'].astype(str).tolist() == df['platform'].astype(str).tolist()
+
+
+# --- Export Cache ---
+def text_writer(text, calls=None):
+    def write(path):
+        if calls is not None:
+            calls.append(path)
+        with open(path, 'w') as fh:
+            fh.write(text)
+    return write
+
+
+def test_export_cache_writes_each_key_once(tmp_path):
+    cache = ExportCache(directory=str(tmp_path))
+    calls = []
+    writer = text_writer('a\n1\n', calls)
+
+    first = cache.get_or_create('key', '.csv', writer)
+    assert cache.get_or_create('key', '.csv', writer) == first
+    assert calls == [first]
+    os.remove(first)  # e.g. a cleaned temp directory
+    assert cache.get('key') is None
+    cache.get_or_create('key', '.csv', writer)
+    assert len(calls) == 2
+
+
+def test_export_cache_evicts_and_deletes_oldest_files(tmp_path):
+    cache = ExportCache(max_entries=2, max_bytes=10 ** 6, directory=str(tmp_path))
+    paths = [cache.get_or_create(key, '.csv', text_writer('')) for key in 'abc']
+    assert cache.get('a') is None and not os.path.exists(paths[0])
+    assert cache.get('b') == paths[1] and cache.get('c') == paths[2]
+
+
+def test_export_cache_keeps_newest_file_over_byte_cap(tmp_path):
+    cache = ExportCache(max_entries=10, max_bytes=5, directory=str(tmp_path))
+    for key in 'ab':
+        cache.get_or_create(key, '.csv', text_writer('123456'))
+    assert cache.get('a') is None and cache.get('b') is not None
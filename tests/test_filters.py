@@ -0,0 +1,106 @@
+# tests/test_filters.py
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from filters import FilterIndex, filter_state_key
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(4)
+    rows = 1003  # not a multiple of 8, so the last bitmap byte is partial
+    return pd.DataFrame({
+        'date': np.sort(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, rows), unit='D')),
+        'platform': pd.Categorical(rng.choice(['Instagram', 'TikTok', 'X'], rows)),
+        'sentiment': pd.Categorical(rng.choice(['positive', 'neutral', 'negative', None], rows)),
+        'location': pd.Categorical(rng.choice([f"Kota {number}" for number in range(100)], rows)),
+    })
+
+
+def expected_rows(df, selections):
+    mask = np.ones(len(df), dtype=bool)
+    for dim, values in selections.items():
+        if values is not None:
+            mask &= df[dim].isin(values).to_numpy()
+    return np.flatnonzero(mask)
+
+
+SELECTIONS = [
+    {'platform': ['TikTok']},
+    {'platform': ['TikTok', 'X'], 'sentiment': ['negative']},
+    {'sentiment': ['positive', 'Tidak ada'], 'location': ['Kota 3', 'Kota 70', 'Kota 99']},
+    {'platform': None, 'location': ['Kota 5']},
+]
+
+
+@pytest.mark.parametrize('selections', SELECTIONS)
+def test_select_ors_within_and_ands_across_dimensions(frame, selections):
+    np.testing.assert_array_equal(FilterIndex(frame).select(selections), expected_rows(frame, selections))
+
+
+@pytest.mark.parametrize('selections', SELECTIONS)
+def test_code_lookup_matches_bitmaps(frame, selections):
+    with_bitmaps = FilterIndex(frame)
+    without_bitmaps = FilterIndex(frame, bitmap_max_values=0)
+    assert set(with_bitmaps.bitmaps) == {'platform', 'sentiment'}  # 100 locations exceed the limit
+    assert not without_bitmaps.bitmaps
+    np.testing.assert_array_equal(without_bitmaps.select(selections), with_bitmaps.select(selections))
+
+
+def test_empty_selection_matches_nothing_and_none_everything(frame):
+    index = FilterIndex(frame)
+    assert len(index.select({'platform': []})) == 0
+    assert len(index.select({'location': ['Tidak ada']})) == 0
+    assert index.select({'platform': None}) == slice(0, len(frame))
+    assert index.apply(frame, {'platform': None}) is frame
+
+
+def test_missing_values_only_match_when_unfiltered(frame):
+    index = FilterIndex(frame)
+    rows = index.select({'sentiment': ['positive', 'neutral', 'negative']})
+    assert len(rows) == frame['sentiment'].notna().sum()
+
+
+def test_index_rejects_unsorted_frame(frame):
+    with pytest.raises(ValueError):
+        FilterIndex(frame.iloc[::-1])
+
+
+def test_normalize_and_state_key(frame):
+    index = FilterIndex(frame)
+    normalized = index.normalize({'platform': ['X', 'TikTok', 'X', 'Tidak ada'], 'sentiment': None,
+                                  'location': [f"Kota {number}" for number in range(100)]})
+    assert normalized == {'platform': ['TikTok', 'X'], 'sentiment': None, 'location': None}
+    assert filter_state_key({'platform': ['X', 'TikTok']}) == filter_state_key({'platform': ['TikTok', 'X', 'X']})
+    assert filter_state_key({'platform': []}) != filter_state_key({'platform': None})
+
+
+DATE_RANGES = [
+    (datetime.date(2024, 1, 1), datetime.date(2024, 3, 30)),
+    (datetime.date(2024, 2, 10), datetime.date(2024, 2, 10)),
+    (datetime.date(2023, 12, 1), datetime.date(2024, 1, 5)),
+    (datetime.date(2024, 5, 1), datetime.date(2024, 6, 1)),
+]
+
+
+@pytest.mark.parametrize('date_range', DATE_RANGES)
+def test_date_range_is_a_slice_found_by_binary_search(frame, date_range):
+    start, end = date_range
+    dates = frame['date'].dt.date
+    expected = np.flatnonzero((dates >= start) & (dates <= end))
+    rows = FilterIndex(frame).select({}, date_range=date_range)
+    assert isinstance(rows, slice)
+    np.testing.assert_array_equal(np.arange(len(frame))[rows], expected)
+
+
+@pytest.mark.parametrize('date_range', DATE_RANGES)
+def test_date_range_combines_with_selections(frame, date_range):
+    start, end = date_range
+    selections = {'platform': ['Instagram'], 'location': ['Kota 1', 'Kota 2', 'Kota 3', 'Kota 4']}
+    dates = frame['date'].dt.date.to_numpy()
+    expected = [row for row in expected_rows(frame, selections) if start <= dates[row] <= end]
+    np.testing.assert_array_equal(FilterIndex(frame).select(selections, date_range=date_range), expected)
@@ -0,0 +1,57 @@
+# tests/test_geocoding.py
+
+import pandas as pd
+
+from analysis import geo_figure, location_map_frame
+from geocoding import load_gazetteer, normalize_place_names, resolve_locations
+from ingest import Dataset, read_media_csv
+
+
+def test_normalize_place_names():
+    names = ['  D.I. Yogyakarta ', 'JAKARTA-Selatan', 'Kab. Bandung', 'Jakarta_Utara!']
+    assert normalize_place_names(names).tolist() == ['di yogyakarta', 'jakarta selatan', 'kab bandung', 'jakarta utara']
+
+
+def test_resolve_locations_matches_names_aliases_and_prefixed_names():
+    resolved = resolve_locations(['Bandung', 'bandung', 'Jogja', 'D.I. Yogyakarta', 'Kota Bandung',
+                                  'Kabupaten Bandung', 'Jaksel', 'Singapura'])
+    assert resolved['name'].tolist() == ['Bandung', 'Bandung', 'Yogyakarta', 'DI Yogyakarta', 'Bandung',
+                                         'Bandung', 'Jakarta Selatan', 'Singapore']
+    assert resolved.loc['Jaksel', 'kind'] == 'city'
+    assert resolved.loc['Singapura', 'country'] == 'Singapore'
+
+
+def test_alias_with_prefix_is_matched_before_prefix_stripping():
+    # "Kota Jambi" is an alias of the city; "Jambi" alone prefers the province
+    resolved = resolve_locations(['Kota Jambi', 'Jambi'])
+    assert resolved['kind'].tolist() == ['city', 'province']
+
+
+def test_unresolved_and_missing_locations():
+    resolved = resolve_locations(['Atlantis', None, 'Bandung', 'Atlantis'])
+    assert resolved.index.tolist() == ['Atlantis', 'Bandung']
+    assert resolved.loc['Atlantis'].isna().all()
+    assert resolved.loc['Bandung', 'lat'] == -6.9175
+
+
+def test_gazetteer_is_loaded_once(tmp_path):
+    path = tmp_path / 'places.csv'
+    path.write_text("name,kind,country,lat,lon,aliases\nKota Baru,city,Indonesia,1.0,2.0,\n")
+    assert load_gazetteer(str(path)) is load_gazetteer(str(path))
+    resolved = resolve_locations(pd.Series(['kota baru', 'Baru']), path=str(path))
+    assert resolved.loc['kota baru', 'name'] == 'Kota Baru'
+    assert pd.isna(resolved.loc['Baru', 'name'])  # prefixes are only stripped from the upload's names
+
+
+def test_map_plots_unresolved_locations_as_country_names(media_csv):
+    dates = pd.date_range('2024-01-01', periods=6, freq='D')
+    df, _ = read_media_csv(media_csv(dates, Location=['Jakarta', 'Bandung', 'Kenya', 'Kenya', 'Chile', 'Atlantis']))
+    dataset = Dataset('key', df)
+    frame, unresolved = location_map_frame(dataset.cube.summarize({}), dataset)
+    assert sorted(unresolved) == ['Atlantis', 'Chile', 'Kenya']
+
+    located, by_name = geo_figure(frame).data
+    assert len(located.lat) == 2
+    assert by_name.locationmode == 'country names'
+    assert sorted(by_name.locations) == ['Atlantis', 'Chile', 'Kenya']
+    assert located.marker.sizeref == by_name.marker.sizeref
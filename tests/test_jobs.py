@@ -0,0 +1,50 @@
+# tests/test_jobs.py
+
+import threading
+
+import pandas as pd
+
+from analysis import load_files
+from diagnostics import StageRecorder
+from ingest import file_digest
+from jobs import IngestJobs
+
+
+def test_job_records_stages_on_its_own_recorder():
+    jobs = IngestJobs(max_workers=1)
+    recorder = StageRecorder(session='s1')
+
+    def load(job):
+        with job.recorder.stage('read_csv'):
+            job.report_progress(10, 100, 100)
+        return 'dataset'
+
+    job = jobs.submit('key', load, total_bytes=100, recorder=recorder)
+    job.future.result()
+    assert job.status == 'done' and job.result == 'dataset'
+    assert [record['stage'] for record in job.recorder.records] == ['read_csv']
+    assert job.recorder.records[0]['session'] == 's1'
+
+
+def test_submitting_a_running_key_shares_the_job():
+    jobs = IngestJobs(max_workers=1)
+    release = threading.Event()
+    first = jobs.submit('key', lambda job: release.wait())
+    assert jobs.submit('key', lambda job: None) is first
+    first.cancel()
+    release.set()
+    first.future.result()
+    assert first.status == 'cancelled'
+
+
+def test_ingest_job_is_done_only_once_the_indexes_are_built(media_csv):
+    weeks = {'a.csv': media_csv(pd.date_range('2024-01-01', periods=7, freq='D'), Location='Jakarta'),
+             'b.csv': media_csv(pd.date_range('2024-01-08', periods=7, freq='D'), Location='Kenya')}
+    files = [(name, file_digest(file_bytes), file_bytes) for name, file_bytes in weeks.items()]
+    job = IngestJobs(max_workers=1).submit('key', lambda job: load_files(files, progress=job.report_progress))
+    job.future.result()
+    dataset = job.result
+    assert job.status == 'done'
+    assert dataset._cube is not None and dataset._locations is not None
+    assert dataset.cube.summarize({}).num_rows == 14
+    assert sorted(dataset.locations.index) == ['Jakarta', 'Kenya']
@@ -0,0 +1,80 @@
+# tests/test_parallel_ingest.py
+
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from ingest import read_media_csv, read_media_csv_chunked, read_media_csv_parallel, split_csv_ranges
+
+SORTED_DATES = pd.date_range('2024-01-01', '2024-12-31', freq='D').repeat(100)
+
+
+def test_split_csv_ranges_covers_body_on_line_boundaries():
+    file_bytes = b'a,b\n' + b''.join(b'%d,x\n' % number for number in range(1000))
+    header_end, ranges = split_csv_ranges(file_bytes, range_bytes=100)
+    assert header_end == 4
+    assert ranges[0][0] == header_end and ranges[-1][1] == len(file_bytes)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert all(file_bytes[end - 1:end] == b'\n' for _, end in ranges)
+
+
+def test_split_csv_ranges_keeps_quoted_newlines_together():
+    rows = [b'%d,"line one\nline two, ""quoted""\nline three"\n' % number for number in range(200)]
+    file_bytes = b'id,text\n' + b''.join(rows)
+    header_end, ranges = split_csv_ranges(file_bytes, range_bytes=64)
+    assert len(ranges) > 1
+    parts = [pd.read_csv(io.BytesIO(file_bytes[:header_end] + file_bytes[start:end])) for start, end in ranges]
+    combined = pd.concat(parts, ignore_index=True)
+    pd.testing.assert_frame_equal(combined, pd.read_csv(io.BytesIO(file_bytes)))
+
+
+def test_split_csv_ranges_rejects_quoted_header():
+    assert split_csv_ranges(b'"a\nb",c\n1,2\n') is None
+
+
+@pytest.fixture
+def day_first_csv(media_csv):
+    # Sorted by date and split into many ranges, most of which only hold days <= 12
+    return media_csv(SORTED_DATES, '%d/%m/%Y', Note=['catatan "penting"\nbaris kedua'] * len(SORTED_DATES))
+
+
+def test_parallel_read_matches_whole_file_read(day_first_csv):
+    whole, whole_report = read_media_csv(day_first_csv)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel, parallel_report = read_media_csv_parallel(day_first_csv, executor, range_bytes=16 * 1024)
+
+    assert parallel_report['date_format'] == whole_report['date_format'] == '%d/%m/%Y'
+    assert parallel_report['rows'] == whole_report['rows']
+    assert (parallel['date'].dt.dayofyear == parallel['engagements']).all()
+    pd.testing.assert_frame_equal(parallel, whole)
+
+
+def test_parallel_read_in_process_pool(day_first_csv):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel, _ = read_media_csv_parallel(day_first_csv, executor, range_bytes=256 * 1024)
+    pd.testing.assert_frame_equal(parallel, read_media_csv(day_first_csv)[0])
+
+
+def test_chunked_read_matches_whole_file_read(day_first_csv):
+    chunked, _ = read_media_csv_chunked(day_first_csv, chunksize=1000)
+    pd.testing.assert_frame_equal(chunked, read_media_csv(day_first_csv)[0])
+
+
+def test_chunked_read_reports_progress(media_csv):
+    file_bytes = media_csv(SORTED_DATES[:2500])
+    calls = []
+    read_media_csv_chunked(file_bytes, chunksize=1000, progress=lambda *args: calls.append(args))
+    assert [rows for rows, _, _ in calls] == [1000, 2000, 2500]
+    assert calls[-1][1] == calls[-1][2] == len(file_bytes)
+
+
+def test_parallel_read_of_month_first_file_uses_one_format(media_csv):
+    # Ranges holding only days <= 12 fit both conventions; the file as a whole is month-first
+    file_bytes = media_csv(SORTED_DATES, '%m/%d/%Y')
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel, report = read_media_csv_parallel(file_bytes, executor, range_bytes=16 * 1024)
+    assert report['date_format'] == '%m/%d/%Y'
+    assert (parallel['date'].dt.dayofyear == parallel['engagements']).all()
+    pd.testing.assert_frame_equal(parallel, read_media_csv(file_bytes)[0])
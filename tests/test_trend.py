@@ -0,0 +1,71 @@
+# tests/test_trend.py
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregations import choose_trend_bucket, lttb_indices, month_start, summarize, week_start
+
+
+def test_week_and_month_start_match_pandas_periods():
+    dates = pd.DatetimeIndex(pd.date_range('2023-12-25', '2024-03-10 18:00', freq='7h'))
+    np.testing.assert_array_equal(week_start(dates), dates.to_period('W').start_time.to_numpy())
+    np.testing.assert_array_equal(month_start(dates), dates.to_period('M').start_time.to_numpy())
+
+
+@pytest.mark.parametrize('days, bucket', [(1, 'D'), (600, 'D'), (601, 'W'), (4200, 'W'), (4201, 'M'), (40_000, 'M')])
+def test_choose_trend_bucket_picks_finest_bucket_within_limit(days, bucket):
+    start = datetime.date(2000, 1, 1)
+    assert choose_trend_bucket(start, start + datetime.timedelta(days=days - 1), max_buckets=600) == bucket
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    rng = np.random.default_rng(14)
+    x = np.arange(5000)
+    y = rng.normal(100, 5, len(x))
+    y[1234], y[3777] = 1000, -1000
+    kept = lttb_indices(x, y, 150)
+    assert len(kept) == 150
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+    assert (np.diff(kept) > 0).all()
+    assert {1234, 3777} <= set(kept.tolist())
+
+
+@pytest.mark.parametrize('threshold', [2, 10, 11])
+def test_lttb_leaves_short_series_alone(threshold):
+    np.testing.assert_array_equal(lttb_indices(np.arange(10), np.ones(10), threshold), np.arange(10))
+
+
+@pytest.fixture
+def daily_summary():
+    dates = pd.date_range('2020-01-01', '2024-12-31', freq='D')
+    return summarize(pd.DataFrame({
+        'date': dates,
+        'platform': pd.Categorical(['Instagram'] * len(dates)),
+        'sentiment': pd.Categorical(['positive'] * len(dates)),
+        'media_type': pd.Categorical(['video'] * len(dates)),
+        'location': pd.Categorical(['Jakarta'] * len(dates)),
+        'engagements': np.arange(len(dates), dtype='int32') % 97,
+    }))
+
+
+def test_engagement_trend_buckets_by_range(daily_summary):
+    trend, bucket = daily_summary.engagement_trend(datetime.date(2024, 12, 1), datetime.date(2024, 12, 31))
+    assert bucket == 'D'
+    trend, bucket = daily_summary.engagement_trend(datetime.date(2020, 1, 1), datetime.date(2024, 12, 31),
+                                                   target_points=300)
+    assert bucket == 'W'
+    assert trend['engagements'].sum() == daily_summary.total_engagements
+    assert len(trend) == len(np.unique(week_start(daily_summary.daily_engagements.index)))
+
+
+def test_engagement_trend_downsamples_long_series(daily_summary):
+    trend, bucket = daily_summary.engagement_trend(datetime.date(2020, 1, 1), datetime.date(2024, 12, 31),
+                                                   target_points=100, bucket='D')
+    assert bucket == 'D'
+    assert len(trend) == 100
+    assert trend['date'].iloc[0] == pd.Timestamp('2020-01-01')
+    assert trend['date'].iloc[-1] == pd.Timestamp('2024-12-31')
+    assert trend['date'].is_monotonic_increasing